@@ -0,0 +1,131 @@
+"""
+Encoder loading module.
+
+- backend selection for SentenceTransformer encoders (torch, onnx, trt, int8)
+- half-precision (fp16/bf16) weights for PyTorch encoders on GPU
+- INT8 dynamic quantization for CPU-only deployments
+- fallback to plain PyTorch when an accelerated backend is unavailable
+
+"""
+import os
+from typing import Dict
+import torch
+from sentence_transformers import SentenceTransformer
+from sentence_transformers.models import CLIPModel
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Inference backend for CLIP / MiniLM encoders (torch, onnx, trt, int8)
+CLIP_BACKEND = os.getenv('MOSAIC_CLIP_BACKEND', 'torch').lower()
+
+SUPPORTED_BACKENDS = ("torch", "onnx", "trt", "int8")
+
+# Built TensorRT engines are cached here so they are only compiled on first load
+TRT_CACHE_DIR = os.getenv('MOSAIC_TRT_CACHE_DIR', './trt_cache')
+
+# Weight precision for PyTorch encoders on GPU (fp32, fp16, bf16); CPU always runs fp32
+ENCODER_PRECISION = os.getenv('MOSAIC_ENCODER_PRECISION', 'fp16').lower()
+
+_HALF_DTYPES = {"fp16": torch.float16, "bf16": torch.bfloat16}
+
+
+def _onnx_model_kwargs(backend: str, device: str) -> Dict:
+    """
+    Build ONNX Runtime session kwargs for the requested backend.
+    TensorRT runs through ONNX Runtime's TensorRT execution provider in FP16,
+    with compiled engines cached on disk (engine builds take minutes).
+    """
+    if backend == "trt":
+        return {
+            "provider": "TensorrtExecutionProvider",
+            "provider_options": {
+                "trt_fp16_enable": True,
+                "trt_engine_cache_enable": True,
+                "trt_engine_cache_path": TRT_CACHE_DIR,
+            },
+        }
+    if device == "cuda":
+        return {"provider": "CUDAExecutionProvider"}
+    return {"provider": "CPUExecutionProvider"}
+
+
+def load_encoder(
+    model_name: str,
+    device: str,
+    backend: str = CLIP_BACKEND,
+    precision: str = ENCODER_PRECISION
+) -> SentenceTransformer:
+    """
+    Load a SentenceTransformer encoder on the requested inference backend.
+
+    args:
+        model_name: SentenceTransformer model name (e.g. 'clip-ViT-B-32')
+        device: 'cuda' or 'cpu'
+        backend: 'torch', 'onnx', 'trt' (TensorRT via ONNX Runtime) or 'int8' (CPU only)
+        precision: 'fp32', 'fp16' or 'bf16' weights for the torch backend on CUDA
+    returns:
+        Loaded SentenceTransformer. Falls back to PyTorch if the accelerated
+        backend cannot be loaded (missing onnxruntime/optimum) or does not apply
+        (CLIP modules), in which case the requested precision still applies.
+        Embeddings from half-precision models should be cast to float32 by the caller.
+    """
+    backend = (backend or "torch").lower()
+    if backend not in SUPPORTED_BACKENDS:
+        print(f"⚠ Unknown encoder backend '{backend}', using torch")
+        backend = "torch"
+
+    model = None
+    if backend in ("onnx", "trt"):
+        try:
+            model = SentenceTransformer(
+                model_name,
+                device=device,
+                backend="onnx",
+                model_kwargs=_onnx_model_kwargs(backend, device),
+            )
+        except Exception as e:
+            print(f"⚠ {backend.upper()} backend unavailable for {model_name} ({e}), using torch")
+        else:
+            # backend="onnx" only applies to Transformer modules; CLIP silently loads in PyTorch
+            if not isinstance(model[0], CLIPModel):
+                print(f"✓ {model_name} loaded with {backend.upper()} backend")
+                return model
+            print(f"⚠ {backend.upper()} backend does not support CLIP modules, running {model_name} on torch")
+
+    if model is None:
+        model = SentenceTransformer(model_name, device=device)
+
+    if backend == "int8":
+        if device != "cpu":
+            print(f"⚠ INT8 backend is CPU-only, keeping {model_name} in full precision on {device}")
+            return model
+        model = quantize_int8(model)
+        print(f"✓ {model_name} quantized to INT8 (dynamic)")
+        return model
+
+    dtype = _HALF_DTYPES.get((precision or "fp32").lower())
+    if dtype is not None and device == "cuda":
+        model = model.to(dtype=dtype)
+        # Image inputs arrive as float32 pixel_values; match the weights' dtype
+        model[0].register_forward_pre_hook(_cast_pixel_values(dtype))
+        print(f"✓ {model_name} running in {precision.upper()} on {device}")
+
+    return model
+
+
+def _cast_pixel_values(dtype: torch.dtype):
+    """Forward pre-hook casting image pixel_values to the encoder's weight dtype."""
+    def hook(module, args):
+        features = args[0]
+        if "pixel_values" in features:
+            features["pixel_values"] = features["pixel_values"].to(dtype)
+    return hook
+
+
+def quantize_int8(model: SentenceTransformer) -> SentenceTransformer:
+    """
+    Apply dynamic INT8 quantization to all Linear layers (weights int8,
+    activations quantized on the fly). CPU inference only.
+    """
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
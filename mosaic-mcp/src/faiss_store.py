@@ -0,0 +1,151 @@
+"""
+FAISS index storage module.
+
+- FAISS id -> frame path mapping
+- fp16 embedding sidecars (persist / reload frame embeddings)
+- FAISS index construction (Flat, SQfp16, SQ8, HNSW, HNSW_SQ8, IVFPQ)
+- index persistence with a JSON sidecar (normalization / metric)
+
+Kept free of model loading so the search engine can rebuild indices
+without importing the video processing pipeline.
+
+"""
+import os
+import json
+import math
+from typing import List
+import numpy as np
+import faiss
+import torch
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Device configuration - Use GPU if available
+DEVICE = os.getenv('DEVICE', 'auto')
+if DEVICE == 'auto':
+    device = 'cuda' if torch.cuda.is_available() else 'cpu'
+else:
+    device = DEVICE
+
+# FAISS index type: auto (IVFPQ for large videos, HNSW_SQ8 otherwise), Flat, SQfp16, SQ8, HNSW, HNSW_SQ8, IVFPQ
+FAISS_INDEX_TYPE = os.getenv('FAISS_INDEX_TYPE', 'auto').lower()
+IVFPQ_MIN_VECTORS = int(os.getenv('FAISS_IVFPQ_MIN_VECTORS', '10000'))
+FAISS_NLIST = int(os.getenv('FAISS_NLIST', '0'))  # 0 = derive from corpus size
+FAISS_NPROBE = int(os.getenv('FAISS_NPROBE', '8'))
+PQ_M = 32  # sub-quantizers (512-d CLIP -> 32 x 16-d sub-vectors, 1 byte code each)
+HNSW_M = 32  # graph neighbours per node
+HNSW_EF_SEARCH = int(os.getenv('FAISS_HNSW_EF_SEARCH', '64'))
+
+# FFmpeg output pattern for extracted frames; FAISS id i is frame i + 1
+FRAME_PATTERN = 'frame_%04d.jpg'
+
+
+def frame_paths_for(output_dir: str, count: int) -> List[str]:
+    """
+    Paths of the first count frames written with FFmpeg's frame_%04d.jpg pattern, in frame order.
+    """
+    return [os.path.join(output_dir, FRAME_PATTERN % i) for i in range(1, count + 1)]
+
+
+def save_embeddings_fp16(embeddings: np.ndarray, path: str):
+    """
+    Persist embeddings as a float16 .npy sidecar (half the bytes of fp32).
+    Lets the FAISS index be rebuilt without re-running the image encoder.
+    """
+    np.save(path, np.asarray(embeddings, dtype=np.float16))
+
+
+def load_embeddings_fp16(path: str) -> np.ndarray:
+    """
+    Memory-map a float16 embeddings sidecar and return it as float32.
+    """
+    return np.asarray(np.load(path, mmap_mode='r'), dtype=np.float32)
+
+
+def build_faiss_index(embeddings: np.ndarray) -> faiss.Index:
+    """
+    Build a FAISS index for the embeddings according to FAISS_INDEX_TYPE.
+    IVFPQ stores PQ{m}x8 codes (1 byte per sub-vector) in {nlist} inverted lists
+    and needs enough vectors to train; smaller corpora use an HNSW graph over
+    int8 scalar-quantized vectors (HNSW_SQ8: sub-linear search, 4x smaller than fp32).
+    SQ8 is brute force over int8 codes; Flat and SQfp16 (fp16 vectors) are exact.
+    """
+    n, dimension = embeddings.shape
+    index_type = FAISS_INDEX_TYPE
+    if index_type == 'auto':
+        index_type = 'ivfpq' if n >= IVFPQ_MIN_VECTORS else 'hnsw_sq8'
+
+    # k-means wants ~39 training points per centroid; PQ needs 256 per sub-quantizer
+    nlist = FAISS_NLIST or min(max(64, int(4 * math.sqrt(n))), n // 39)
+    if index_type == 'ivfpq' and (nlist < 1 or n < 39 * nlist or n < 256 or dimension % PQ_M):
+        print(f"⚠ Not enough vectors ({n}) to train IVFPQ, using Flat index")
+        index_type = 'flat'
+
+    if index_type == 'ivfpq':
+        quantizer = faiss.IndexFlatL2(dimension)
+        index = faiss.IndexIVFPQ(quantizer, dimension, nlist, PQ_M, 8)
+        index.train(embeddings)
+        index.nprobe = FAISS_NPROBE
+        print(f"✓ FAISS IVFPQ index (nlist={nlist}, m={PQ_M}) trained on {n} vectors")
+    elif index_type == 'hnsw':
+        index = faiss.IndexHNSWFlat(dimension, HNSW_M)
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    elif index_type == 'hnsw_sq8':
+        index = faiss.IndexHNSWSQ(dimension, faiss.ScalarQuantizer.QT_8bit, HNSW_M, faiss.METRIC_L2)
+        index.train(embeddings)  # per-dimension min/max for the int8 codes
+        index.hnsw.efSearch = HNSW_EF_SEARCH
+    elif index_type == 'sq8':
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+        index.train(embeddings)
+    elif index_type == 'sqfp16':
+        index = faiss.IndexScalarQuantizer(dimension, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+    else:
+        index = faiss.IndexFlatL2(dimension)
+
+    index.add(embeddings)
+    return index
+
+
+def index_meta_path(index_path: str) -> str:
+    """Path of the JSON sidecar describing a FAISS index (faiss_index.bin -> faiss_index.json)."""
+    return os.path.splitext(index_path)[0] + ".json"
+
+
+def store_embeddings_faiss(
+    embeddings: np.ndarray,
+    index_path: str,
+    copy: bool = True
+) -> faiss.Index:
+    """
+    Store image embeddings in FAISS index.
+    Fast similarity search with GPU acceleration if available.
+    Embeddings are L2-normalized, so L2 distance ranks frames by cosine similarity
+    (d = 2 - 2cos); the sidecar JSON tells the search engine to normalize queries too.
+    With copy=False a C-contiguous float32 array is normalized in place and
+    handed to FAISS as-is, without an intermediate copy.
+    """
+    if copy:
+        embeddings = np.array(embeddings, dtype=np.float32, order='C')
+    else:
+        embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)  # no-op for float32 C arrays
+    faiss.normalize_L2(embeddings)
+    cpu_index = build_faiss_index(embeddings)
+    with open(index_meta_path(index_path), "w") as f:
+        json.dump({"normalized": True, "metric": "l2", "ntotal": int(cpu_index.ntotal)}, f)
+    
+    # Try to use GPU for FAISS if available
+    try:
+        if device == 'cuda' and faiss.get_num_gpus() > 0:
+            res = faiss.StandardGpuResources()
+            gpu_index = faiss.index_cpu_to_gpu(res, 0, cpu_index)
+            print("✓ FAISS using GPU acceleration")
+            # Save CPU version to disk (GPU index can't be saved directly)
+            faiss.write_index(cpu_index, index_path)
+            return gpu_index
+    except Exception as e:
+        print(f"⚠ FAISS GPU not available ({e}), using CPU")
+    
+    # Save index to disk
+    faiss.write_index(cpu_index, index_path)
+    return cpu_index
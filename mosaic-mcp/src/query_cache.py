@@ -0,0 +1,109 @@
+"""
+Query embedding cache module.
+
+- encoder registry (keyed by model name so cache keys stay hashable)
+- LRU cache of text-query embeddings, so repeated queries skip the encoder forward pass
+- content-hash (SHA-256) LRU cache of query-image embeddings, so a reused image skips the vision encoder
+
+"""
+import hashlib
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict
+import numpy as np
+import torch
+from PIL import Image
+from sentence_transformers import SentenceTransformer
+
+TEXT_QUERY_CACHE_SIZE = 2048
+IMAGE_QUERY_CACHE_SIZE = 256
+
+_models: Dict[str, SentenceTransformer] = {}
+
+# (model name, sha256 of image bytes) -> (1, dim) float32 embedding
+_img_emb_cache: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+_img_lock = threading.Lock()
+_img_stats = {"hits": 0, "misses": 0}
+
+
+def register_model(model_name: str, model: SentenceTransformer):
+    """Register the encoder used for cached lookups of model_name."""
+    _models[model_name] = model
+
+
+@lru_cache(maxsize=TEXT_QUERY_CACHE_SIZE)
+def _cached_text_embedding(model_name: str, query: str) -> bytes:
+    """
+    Encode a single text query. Returned as raw float32 bytes so the cached
+    value is immutable and compact.
+    """
+    with torch.inference_mode():
+        embedding = _models[model_name].encode([query], show_progress_bar=False)
+    return np.asarray(embedding, dtype=np.float32).tobytes()
+
+
+def text_embedding(model_name: str, query: str) -> np.ndarray:
+    """
+    Get the (1, dim) float32 embedding of a text query, encoding it only on a cache miss.
+    The returned array is a read-only view over the cached bytes.
+    """
+    return np.frombuffer(_cached_text_embedding(model_name, query), dtype=np.float32).reshape(1, -1)
+
+
+def image_embedding(model_name: str, image_path: str) -> np.ndarray:
+    """
+    Get the (1, dim) float32 embedding of a query image. Keyed on the SHA-256 of the
+    file bytes, so the same image re-uploaded under a different path is still a hit.
+    """
+    with open(image_path, "rb") as f:
+        key = (model_name, hashlib.sha256(f.read()).digest())
+
+    with _img_lock:
+        embedding = _img_emb_cache.get(key)
+        if embedding is not None:
+            _img_emb_cache.move_to_end(key)
+            _img_stats["hits"] += 1
+            return embedding
+        _img_stats["misses"] += 1
+
+    image = Image.open(image_path).convert('RGB')
+    with torch.inference_mode():
+        embedding = _models[model_name].encode([image], show_progress_bar=False)
+    embedding = np.asarray(embedding, dtype=np.float32).reshape(1, -1)
+    embedding.flags.writeable = False
+
+    with _img_lock:
+        _img_emb_cache[key] = embedding
+        _img_emb_cache.move_to_end(key)
+        while len(_img_emb_cache) > IMAGE_QUERY_CACHE_SIZE:
+            _img_emb_cache.popitem(last=False)
+    return embedding
+
+
+def cache_stats() -> Dict:
+    """Hit/miss statistics for the query embedding caches."""
+    info = _cached_text_embedding.cache_info()
+    with _img_lock:
+        image_stats = {
+            "hits": _img_stats["hits"],
+            "misses": _img_stats["misses"],
+            "size": len(_img_emb_cache),
+            "maxsize": IMAGE_QUERY_CACHE_SIZE
+        }
+    return {
+        "text_queries": {
+            "hits": info.hits,
+            "misses": info.misses,
+            "size": info.currsize,
+            "maxsize": info.maxsize
+        },
+        "image_queries": image_stats
+    }
+
+
+def clear_cache():
+    """Drop all cached query embeddings."""
+    _cached_text_embedding.cache_clear()
+    with _img_lock:
+        _img_emb_cache.clear()
@@ -0,0 +1,114 @@
+"""
+Search micro-batching module.
+
+- coalesces concurrent single-query FAISS searches on the same index into one batched index.search
+- leader/follower batching: the first caller waits briefly for others, runs the batch, and hands out rows
+- uncontended searches skip the batching window entirely
+
+"""
+import os
+import threading
+from typing import Dict, Hashable, Tuple
+import numpy as np
+import faiss
+
+# Batching window and size; FAISS_BATCH_WAIT_MS=0 disables batching
+MAX_BATCH = int(os.getenv('FAISS_MAX_BATCH', '32'))
+MAX_WAIT_MS = float(os.getenv('FAISS_BATCH_WAIT_MS', '5'))
+
+
+class _Batch:
+    def __init__(self, index: faiss.Index):
+        self.index = index
+        self.queries = []  # (query vector (1, dim), k)
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.distances = None
+        self.indices = None
+        self.error = None
+
+
+class SearchBatcher:
+    """
+    Coalesce searches arriving within max_wait_ms on the same key into a single
+    index.search call with a stacked query matrix. The leader only waits for
+    followers while other searches are in flight, so a solo query pays no window.
+    """
+
+    def __init__(self, max_batch: int = MAX_BATCH, max_wait_ms: float = MAX_WAIT_MS):
+        self.max_batch = max_batch
+        self.max_wait = max_wait_ms / 1000.0
+        self._lock = threading.Lock()
+        self._open: Dict[Hashable, _Batch] = {}
+        self._active = 0  # searches currently inside search()
+
+    def search(
+        self,
+        key: Hashable,
+        index: faiss.Index,
+        query: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Search index for a single (1, dim) query, possibly batched with
+        concurrent queries on the same key. Returns (distances, indices) of shape (1, k).
+        """
+        if self.max_wait <= 0 or self.max_batch <= 1:
+            return index.search(query, k)
+
+        with self._lock:
+            self._active += 1
+        try:
+            return self._search(key, index, query, k)
+        finally:
+            with self._lock:
+                self._active -= 1
+
+    def _search(
+        self,
+        key: Hashable,
+        index: faiss.Index,
+        query: np.ndarray,
+        k: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        with self._lock:
+            batch = self._open.get(key)
+            is_leader = batch is None or batch.index is not index
+            if is_leader:
+                batch = _Batch(index)
+                self._open[key] = batch
+            slot = len(batch.queries)
+            batch.queries.append((query, k))
+            if len(batch.queries) >= self.max_batch:
+                self._close(key, batch)
+                batch.full.set()
+            contended = self._active > 1
+
+        if is_leader:
+            if contended:
+                batch.full.wait(self.max_wait)
+            with self._lock:
+                self._close(key, batch)
+            self._run(batch)
+        else:
+            batch.done.wait()
+
+        if batch.error is not None:
+            raise batch.error
+        return batch.distances[slot:slot + 1, :k], batch.indices[slot:slot + 1, :k]
+
+    def _close(self, key: Hashable, batch: _Batch):
+        """Stop new queries joining batch (caller holds the lock)."""
+        if self._open.get(key) is batch:
+            del self._open[key]
+
+    @staticmethod
+    def _run(batch: _Batch):
+        try:
+            xq = np.ascontiguousarray(np.vstack([q for q, _ in batch.queries]), dtype=np.float32)
+            k_max = max(k for _, k in batch.queries)
+            batch.distances, batch.indices = batch.index.search(xq, k_max)
+        except Exception as e:
+            batch.error = e
+        finally:
+            batch.done.set()
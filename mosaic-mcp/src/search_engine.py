@@ -1,16 +1,21 @@
 import os
-from PIL import Image
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import chromadb
 import faiss
 import subprocess
 import tempfile
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 import json
 import pprint
 import torch
 from dotenv import load_dotenv
+from encoders import load_encoder, CLIP_BACKEND
+from faiss_store import frame_paths_for, load_embeddings_fp16, store_embeddings_faiss
+from query_cache import register_model, text_embedding, image_embedding
+from search_batcher import SearchBatcher
 
 load_dotenv()
 
@@ -21,59 +26,178 @@ if DEVICE == 'auto':
 else:
     device = DEVICE
 
+# Inverted lists probed per query for IVF indices (recall/speed trade-off)
+FAISS_NPROBE = int(os.getenv('FAISS_NPROBE', '8'))
+
+# Max number of per-video FAISS indices kept in memory
+INDEX_CACHE_SIZE = int(os.getenv('FAISS_INDEX_CACHE_SIZE', '32'))
+
+CLIP_MODEL_NAME = 'clip-ViT-B-32'
+TEXT_MODEL_NAME = 'all-MiniLM-L6-v2'
+
 
 class MultimodalSearchEngine:
-    def __init__(self, storage_dir: str = "./storage"):
+    def __init__(
+        self,
+        storage_dir: str = "./storage",
+        backend: str = CLIP_BACKEND,
+        nprobe: int = FAISS_NPROBE
+    ):
         self.storage_dir = storage_dir
         self.device = device
-        print(f"🔍 Search Engine using device: {self.device.upper()}")
+        self.backend = backend
+        self.nprobe = nprobe
+        print(f"🔍 Search Engine using device: {self.device.upper()} (backend: {self.backend})")
         
-        # Load models with GPU support
-        self.clip_model = SentenceTransformer('clip-ViT-B-32', device=self.device)
-        self.text_model = SentenceTransformer('all-MiniLM-L6-v2', device=self.device)
+        # Load models with GPU support on the configured inference backend
+        self.clip_model = load_encoder(CLIP_MODEL_NAME, self.device, self.backend)
+        self.text_model = load_encoder(TEXT_MODEL_NAME, self.device, self.backend)
+        register_model(CLIP_MODEL_NAME, self.clip_model)
+        register_model(TEXT_MODEL_NAME, self.text_model)
         self.chroma_client = chromadb.PersistentClient(path="./chroma_db")
         self.faiss_index = None
         self.faiss_gpu_resources = None
+        self._index_cache = OrderedDict()
+        self._normalized = {}  # video_id -> index holds L2-normalized vectors
+        self._index_lock = threading.Lock()
+        self.batcher = SearchBatcher()
         self.frame_paths = []
         self.frame_timestamps = []
 
+    def warmup(self):
+        """
+        Run one dummy forward pass through each encoder so kernel selection
+        and lazy allocations happen before the first real query.
+        """
+        with torch.inference_mode():
+            self.clip_model.encode(["warmup"], show_progress_bar=False)
+            self.text_model.encode(["warmup"], show_progress_bar=False)
+
+    def share_memory(self):
+        """
+        Move CPU model weights into shared memory so forked workers map the
+        same pages instead of copying them. No-op for CUDA models.
+        """
+        if self.device == 'cpu':
+            self.clip_model.share_memory()
+            self.text_model.share_memory()
+
     def load_faiss_index(self, video_id: str):
         """
         Load FAISS index, frame paths, and timestamps for given video_id.
-        Optionally move to GPU for faster search.
+        Indices stay resident in an LRU cache keyed by video_id, so only the
+        first query on a video pays the disk load (and GPU transfer).
+        Each entry remembers the (mtime, size) of faiss_index.bin and is reloaded
+        when the file changes (e.g. the video was reprocessed by another worker).
+        
+        Returns:
+            Tuple of (faiss index, frame paths, frame timestamps)
+        """
+        # Stat before reading: if the file is replaced mid-load, the stored
+        # stamp is the old one and the next query reloads
+        stamp = self._index_stamp(video_id)
+        with self._index_lock:
+            entry = self._index_cache.get(video_id)
+            cached = entry[1] if entry is not None and entry[0] == stamp else None
+            if cached is not None:
+                self._index_cache.move_to_end(video_id)
+
+        if cached is None:
+            cached = self._read_faiss_index(video_id)
+            with self._index_lock:
+                self._index_cache[video_id] = (stamp, cached)
+                self._index_cache.move_to_end(video_id)
+                while len(self._index_cache) > INDEX_CACHE_SIZE:
+                    self._index_cache.popitem(last=False)
+
+        self.faiss_index, self.frame_paths, self.frame_timestamps = cached
+        return cached
+
+    def _index_stamp(self, video_id: str):
+        """(mtime_ns, size) of a video's faiss_index.bin, or None if it does not exist."""
+        try:
+            st = os.stat(os.path.join(self.storage_dir, video_id, "faiss_index.bin"))
+        except FileNotFoundError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def invalidate_index(self, video_id: str = None):
+        """
+        Drop a cached index (e.g. after the video is reprocessed), or all of them.
+        """
+        with self._index_lock:
+            if video_id is None:
+                self._index_cache.clear()
+                self._normalized.clear()
+            else:
+                self._index_cache.pop(video_id, None)
+                self._normalized.pop(video_id, None)
+
+    def _query_vector(self, video_id: str, query_embedding: np.ndarray) -> np.ndarray:
+        """
+        float32 query for video_id's index, L2-normalized if the index was built
+        from normalized embeddings (older indices hold raw embeddings).
+        """
+        query = np.array(query_embedding, dtype=np.float32)
+        if self._normalized.get(video_id):
+            faiss.normalize_L2(query)
+        return query
+
+    def _read_faiss_index(self, video_id: str):
+        """
+        Read a video's FAISS index from disk, optionally moving it to GPU for
+        faster search, along with its frame paths and timestamps.
         """
         video_dir = os.path.join(self.storage_dir, video_id)
         faiss_index_path = os.path.join(video_dir, "faiss_index.bin")
 
-        if not os.path.exists(faiss_index_path):
+        embeddings_path = os.path.join(video_dir, "embeddings.f16.npy")
+
+        if os.path.exists(faiss_index_path):
+            # Load CPU index from disk
+            cpu_index = faiss.read_index(faiss_index_path)
+        elif os.path.exists(embeddings_path):
+            # Rebuild from the persisted fp16 frame embeddings; no image encoder pass needed
+            print(f"Rebuilding FAISS index for video {video_id} from {embeddings_path}")
+            store_embeddings_faiss(load_embeddings_fp16(embeddings_path), faiss_index_path, copy=False)
+            cpu_index = faiss.read_index(faiss_index_path)
+        else:
             raise FileNotFoundError(f"FAISS index not found at {faiss_index_path}")
 
-        # Load CPU index from disk
-        cpu_index = faiss.read_index(faiss_index_path)
+        # Indices built with normalized embeddings record it in a JSON sidecar
+        meta_path = os.path.join(video_dir, "faiss_index.json")
+        if os.path.exists(meta_path):
+            with open(meta_path, "r") as f:
+                self._normalized[video_id] = bool(json.load(f).get("normalized"))
+        else:
+            self._normalized[video_id] = False
+
+        # IVF indices only scan nprobe inverted lists per query
+        ivf_index = faiss.try_extract_index_ivf(cpu_index)
+        if ivf_index is not None:
+            ivf_index.nprobe = self.nprobe
         
         # Try to move to GPU for faster search
         try:
             if self.device == 'cuda' and faiss.get_num_gpus() > 0:
                 if self.faiss_gpu_resources is None:
                     self.faiss_gpu_resources = faiss.StandardGpuResources()
-                self.faiss_index = faiss.index_cpu_to_gpu(self.faiss_gpu_resources, 0, cpu_index)
+                index = faiss.index_cpu_to_gpu(self.faiss_gpu_resources, 0, cpu_index)
                 print(f"✓ FAISS index loaded on GPU for video {video_id}")
             else:
-                self.faiss_index = cpu_index
+                index = cpu_index
         except Exception as e:
             print(f"⚠ Could not load FAISS on GPU ({e}), using CPU")
-            self.faiss_index = cpu_index
+            index = cpu_index
 
-        # Load frame paths from frames directory
-        frames_dir = os.path.join(video_dir, "frames")
-        self.frame_paths = sorted([
-            os.path.join(frames_dir, f) for f in os.listdir(frames_dir) if f.endswith(".jpg")
-        ])
+        # FAISS ids follow frame numbering; a lexicographic listdir sort breaks past frame_9999
+        frame_paths = frame_paths_for(os.path.join(video_dir, "frames"), cpu_index.ntotal)
 
         # Load frame timestamps if available
-        self.load_frame_timestamps(video_dir)
+        frame_timestamps = self.load_frame_timestamps(video_dir)
+        return index, frame_paths, frame_timestamps
 
-    def load_frame_timestamps(self, video_dir: str):
+    def load_frame_timestamps(self, video_dir: str) -> List[float]:
         """
         Loads frame timestamps from a JSON file or similar associated with video frames.
         Assumes file 'frame_timestamps.json' in video directory with list of floats.
@@ -81,16 +205,19 @@ class MultimodalSearchEngine:
         timestamps_path = os.path.join(video_dir, "frame_timestamps.json")
         if os.path.exists(timestamps_path):
             with open(timestamps_path, "r") as f:
-                self.frame_timestamps = json.load(f)
-            print(f"Loaded {len(self.frame_timestamps)} frame timestamps.")
+                frame_timestamps = json.load(f)
+            print(f"Loaded {len(frame_timestamps)} frame timestamps.")
         else:
             # If no timestamps file, clear or set empty - fallback to FPS-based timestamps later
-            self.frame_timestamps = []
+            frame_timestamps = []
             print(f"Warning: frame_timestamps.json not found in {video_dir}. Timestamps fallback will be used.")
+        return frame_timestamps
 
-    def search_text(self, query: str, video_id: str, k: int = 5):
+    def search_text(self, query: str, video_id: str, k: int = 5, query_embedding: np.ndarray = None):
         """
         Search for text in the video transcript.
+        The query is embedded with the same MiniLM model used at indexing time
+        (cached per query string) unless query_embedding is given.
         """
         collection_name = f"video_{video_id}"
         try:
@@ -98,8 +225,11 @@ class MultimodalSearchEngine:
         except:
             raise ValueError(f"Transcript collection not found for video '{video_id}'")
 
+        if query_embedding is None:
+            query_embedding = text_embedding(TEXT_MODEL_NAME, query)
+
         results = collection.query(
-            query_texts=[query],
+            query_embeddings=query_embedding.tolist(),
             n_results=k,
             where={"type": "transcript_segment"}
         )
@@ -120,22 +250,34 @@ class MultimodalSearchEngine:
     
 
 
-    def search_image(self, query_image_path: str, video_id: str, k: int = 5, fps: float = 30.0):
-        """Search frames using image similarity (CLIP embeddings)."""
-        if self.faiss_index is None or not self.frame_paths:
-            self.load_faiss_index(video_id)
+    def search_image(
+        self,
+        query_image_path: str,
+        video_id: str,
+        k: int = 5,
+        fps: float = 30.0,
+        query_embedding: np.ndarray = None
+    ):
+        """
+        Search frames using image similarity (CLIP embeddings).
+        The query image embedding is cached by content hash, so reusing an image
+        across k values or videos skips the vision encoder.
+        """
+        faiss_index, frame_paths, frame_timestamps = self.load_faiss_index(video_id)
 
-        image = Image.open(query_image_path).convert('RGB')
-        query_embedding = self.clip_model.encode([image])
+        if query_embedding is None:
+            query_embedding = image_embedding(CLIP_MODEL_NAME, query_image_path)
 
-        distances, indices = self.faiss_index.search(query_embedding.astype('float32'), k)
+        distances, indices = self.batcher.search(
+            video_id, faiss_index, self._query_vector(video_id, query_embedding), k
+        )
 
         results = []
         for idx, dist in zip(indices[0], distances[0]):
-            if idx < len(self.frame_paths):
+            if idx < len(frame_paths):
                 timestamp = None
-                if hasattr(self, 'frame_timestamps') and len(self.frame_timestamps) > idx:
-                    timestamp = self.frame_timestamps[idx]
+                if len(frame_timestamps) > idx:
+                    timestamp = frame_timestamps[idx]
 
                 # Fallback to fps if no timestamp found
                 if timestamp is None:
@@ -143,7 +285,7 @@ class MultimodalSearchEngine:
 
                 clip_start, clip_duration = get_clip_params(timestamp)
                 results.append({
-                    "frame_path": self.frame_paths[idx],
+                    "frame_path": frame_paths[idx],
                     "distance": float(dist),
                     "frame_index": int(idx),
                     "timestamp": timestamp,
@@ -152,7 +294,14 @@ class MultimodalSearchEngine:
                 })
         return results
     
-    def search_visual(self, query_text: str, video_id: str, k: int = 5, fps: float = 30.0):
+    def search_visual(
+        self,
+        query_text: str,
+        video_id: str,
+        k: int = 5,
+        fps: float = 30.0,
+        query_embedding: np.ndarray = None
+    ):
         """
         Search frames using text query with CLIP embeddings.
         This performs visual-semantic search - find frames that visually match the text description.
@@ -163,24 +312,27 @@ class MultimodalSearchEngine:
             video_id: ID of the video to search
             k: Number of results to return
             fps: Frames per second for timestamp calculation
+            query_embedding: Optional precomputed CLIP text embedding of shape (1, dim)
             
         Returns:
             List of matching frames with paths, distances, timestamps, and clip parameters
         """
-        if self.faiss_index is None or not self.frame_paths:
-            self.load_faiss_index(video_id)
+        faiss_index, frame_paths, frame_timestamps = self.load_faiss_index(video_id)
 
-        # Encode text query using CLIP (same model used for image embeddings)
-        query_embedding = self.clip_model.encode([query_text])
+        # Encode text query using CLIP (same model used for image embeddings), cached per query
+        if query_embedding is None:
+            query_embedding = text_embedding(CLIP_MODEL_NAME, query_text)
 
-        distances, indices = self.faiss_index.search(query_embedding.astype('float32'), k)
+        distances, indices = self.batcher.search(
+            video_id, faiss_index, self._query_vector(video_id, query_embedding), k
+        )
 
         results = []
         for idx, dist in zip(indices[0], distances[0]):
-            if idx < len(self.frame_paths):
+            if idx < len(frame_paths):
                 timestamp = None
-                if hasattr(self, 'frame_timestamps') and len(self.frame_timestamps) > idx:
-                    timestamp = self.frame_timestamps[idx]
+                if len(frame_timestamps) > idx:
+                    timestamp = frame_timestamps[idx]
 
                 # Fallback to fps if no timestamp found
                 if timestamp is None:
@@ -188,7 +340,7 @@ class MultimodalSearchEngine:
 
                 clip_start, clip_duration = get_clip_params(timestamp)
                 results.append({
-                    "frame_path": self.frame_paths[idx],
+                    "frame_path": frame_paths[idx],
                     "distance": float(dist),
                     "frame_index": int(idx),
                     "timestamp": timestamp,
@@ -221,15 +373,25 @@ class MultimodalSearchEngine:
             "summary": summary
         }
 
-    def search_caption(self, query: str, video_id: str, k: int = 5, fps: float = 30.0):
+    def search_caption(
+        self,
+        query: str,
+        video_id: str,
+        k: int = 5,
+        fps: float = 30.0,
+        query_embedding: np.ndarray = None
+    ):
         collection_name = f"frames_{video_id}"
         try:
             collection = self.chroma_client.get_collection(name=collection_name)
         except Exception as e:
             raise ValueError(f"Frame captions collection not found for video '{video_id}': {e}")
 
+        if query_embedding is None:
+            query_embedding = text_embedding(TEXT_MODEL_NAME, query)
+
         results = collection.query(
-            query_texts=[query],
+            query_embeddings=query_embedding.tolist(),
             n_results=k,
             where={"type": "frame"}
         )
@@ -324,11 +486,165 @@ def get_clip_params(timestamp, pre_sec=1.0, clip_sec=5.0):
     return start, duration
 
 
+def _extract_clip(
+    video_path: str,
+    start_time: float,
+    duration: float,
+    output_path: str,
+    reencode: bool = False
+):
+    """
+    Run a single FFmpeg clip extraction.
+    Seeks on the input (-ss before -i) and stream-copies by default, which
+    avoids decoding/re-encoding but snaps the start to the previous keyframe.
+    Falls back to re-encoding (libx264/aac, frame accurate) when requested
+    or when the streams cannot be copied into an mp4 container.
+    Returns the output path on success, None otherwise.
+    """
+    codec_args = (
+        ["-c:v", "libx264", "-c:a", "aac"] if reencode
+        else ["-map", "0:v:0", "-map", "0:a?", "-c", "copy", "-avoid_negative_ts", "make_zero"]
+    )
+    cmd = [
+        "ffmpeg",
+        "-hide_banner", "-loglevel", "error", "-nostats",
+        "-ss", str(start_time),
+        "-i", video_path,
+        "-t", str(duration),
+        *codec_args,
+        "-y",
+        output_path
+    ]
+
+    try:
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    except subprocess.CalledProcessError as e:
+        if not reencode:
+            print(f"  ⚠ Stream copy failed for {output_path}, re-encoding")
+            return _extract_clip(video_path, start_time, duration, output_path, reencode=True)
+        print(f"  ✗ FFmpeg error for {output_path}: {e.stderr}")
+        return None
+
+    if not os.path.exists(output_path):
+        print(f"  ✗ Clip file not created: {output_path}")
+        return None
+
+    print(f"  ✓ Clip generated: {output_path}")
+    return output_path
+
+
+def hits_to_soa(hits: List[Dict], pre_sec: float = 1.0, clip_sec: float = 5.0):
+    """
+    Flatten search hits into parallel timing columns (struct-of-arrays).
+    Clip bounds are computed with vectorized NumPy ops instead of per-hit branches.
+
+    Args:
+        hits: List of hits with 'start'/'end' keys (transcript), 'clip_start'/'clip_duration'
+              keys (frames/captions) or a 'timestamp' key.
+        pre_sec: Seconds before a timestamp hit to start its clip.
+        clip_sec: Clip length for timestamp hits.
+
+    Returns:
+        (hit_numbers, starts, durations): int64 hit positions (1-based, used for clip naming)
+        and float64 clip start times and durations, for hits with usable timing info.
+    """
+    n = len(hits)
+    hit_numbers = np.empty(n, dtype=np.int64)
+    raw_start = np.empty(n, dtype=np.float64)
+    raw_duration = np.empty(n, dtype=np.float64)
+    is_point = np.empty(n, dtype=bool)
+    count = 0
+
+    for i, hit in enumerate(hits):
+        # Handle case where hit might be None
+        if hit is None:
+            print(f"Hit #{i+1} is None, skipping")
+            continue
+
+        if 'start' in hit and 'end' in hit:  # Transcript hits
+            raw_start[count] = hit['start']
+            raw_duration[count] = hit['end'] - hit['start']
+            is_point[count] = False
+        elif 'clip_start' in hit and 'clip_duration' in hit and hit['clip_start'] is not None:
+            raw_start[count] = hit['clip_start']
+            raw_duration[count] = hit['clip_duration']
+            is_point[count] = False
+        elif 'timestamp' in hit and hit['timestamp'] is not None:
+            raw_start[count] = hit['timestamp']
+            raw_duration[count] = clip_sec
+            is_point[count] = True
+        else:
+            print(f"Hit #{i+1} missing timing info, skipping clip creation.")
+            print(f"  Expected keys: 'start'+'end', 'clip_start'+'clip_duration', or 'timestamp'")
+            continue
+        hit_numbers[count] = i + 1
+        count += 1
+
+    hit_numbers = hit_numbers[:count]
+    raw_start, raw_duration, is_point = raw_start[:count], raw_duration[:count], is_point[:count]
+
+    # Timestamp hits start pre_sec earlier (not before 0); ranged hits shorter
+    # than 5 seconds are extended to a 20 second default
+    starts = np.where(is_point, np.maximum(raw_start - pre_sec, 0.0), raw_start)
+    durations = np.where(~is_point & (raw_duration < 5), 20.0, raw_duration)
+    return hit_numbers, starts, durations
+
+
+def get_video_clips_from_hits_soa(
+    video_path: str,
+    hit_numbers: np.ndarray,
+    starts: np.ndarray,
+    durations: np.ndarray,
+    output_dir: str,
+    prefix: str = "clip",
+    max_workers: int = None,
+    reencode: bool = False
+) -> List[str]:
+    """
+    Extract video clips for hits given as parallel timing columns (see hits_to_soa).
+    Each FFmpeg invocation is independent, so clips are cut concurrently.
+
+    Args:
+        video_path: Path to the original video file.
+        hit_numbers: 1-based hit positions, used in clip filenames ({prefix}_{n}.mp4).
+        starts: Clip start times in seconds.
+        durations: Clip durations in seconds.
+        output_dir: Directory to save the clipped video files.
+        prefix: Prefix for clip filenames.
+        max_workers: Maximum concurrent FFmpeg processes (default: CPU count).
+        reencode: Re-encode clips for frame-accurate cuts instead of stream copy.
+
+    Returns:
+        List of file paths to the extracted clips, in hit order.
+    """
+    if len(hit_numbers) == 0:
+        return []
+
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = []
+    for n, start_time, duration in zip(hit_numbers.tolist(), starts.tolist(), durations.tolist()):
+        output_path = os.path.join(output_dir, f"{prefix}_{n}.mp4")
+        print(f"Generating clip {n}: {start_time:.2f}s to {start_time + duration:.2f}s -> {output_path}")
+        jobs.append((start_time, duration, output_path))
+
+    workers = min(len(jobs), max_workers or os.cpu_count() or 1)
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        results = executor.map(
+            lambda job: _extract_clip(video_path, *job, reencode=reencode),
+            jobs
+        )
+        clip_paths = [path for path in results if path is not None]
+
+    return clip_paths
+
+
 def get_video_clips_from_hits(
     video_path: str,
     hits: List[Dict],
     output_dir: str,
-    prefix: str = "clip"
+    prefix: str = "clip",
+    max_workers: int = None,
+    reencode: bool = False
 ) -> List[str]:
     """
     Extract video clips from original video corresponding to search hits.
@@ -338,85 +654,26 @@ def get_video_clips_from_hits(
         hits: List of hits with 'start'/'end' keys (transcript) or 'timestamp' key (frames/captions).
         output_dir: Directory to save the clipped video files.
         prefix: Prefix for clip filenames.
+        max_workers: Maximum concurrent FFmpeg processes (default: CPU count).
+        reencode: Re-encode clips for frame-accurate cuts instead of stream copy.
 
     Returns:
-        List of file paths to the extracted clips.
+        List of file paths to the extracted clips, in hit order.
     """
     print(f"\n=== get_video_clips_from_hits called ===")
     print(f"Video path: {video_path}")
     print(f"Output dir: {output_dir}")
     print(f"Number of hits: {len(hits)}")
-    print(f"Hits type: {type(hits)}")
-    print(f"Hits content: {hits}")
     
     if not hits:
         print("WARNING: No hits provided, returning empty list")
         return []
-    
-    os.makedirs(output_dir, exist_ok=True)
-    clip_paths = []
 
-    for i, hit in enumerate(hits):
-        # Handle case where hit might be None
-        if hit is None:
-            print(f"Hit #{i+1} is None, skipping")
-            continue
-            
-        # Debug: print hit structure
-        print(f"\nProcessing hit #{i+1}: {hit}")
-        print(f"  Type: {type(hit)}")
-        print(f"  Keys in hit: {list(hit.keys()) if isinstance(hit, dict) else 'Not a dict'}")
-        
-        if 'start' in hit and 'end' in hit:  # Transcript hits
-            start_time = hit['start']
-            end_time = hit['end']
-            duration = end_time - start_time
-            # Ensure minimum clip duration
-            if duration < 5:  # If clip is less than 5 seconds, extend it
-                duration = 20  # Default to 20 seconds
-            print(f"  Using transcript timing: start={start_time}, end={end_time}, duration={duration}")
-        elif 'clip_start' in hit and 'clip_duration' in hit and hit['clip_start'] is not None:
-            start_time = hit['clip_start']
-            duration = hit['clip_duration']
-            if duration < 5:
-                duration = 20
-            print(f"  Using clip timing: start={start_time}, duration={duration}")
-        elif 'timestamp' in hit and hit['timestamp'] is not None:
-            start_time, duration = get_clip_params(hit['timestamp'])
-            print(f"  Using timestamp: start={start_time}, duration={duration}")
-        else:
-            print(f"Hit #{i+1} missing timing info, skipping clip creation.")
-            print(f"  Expected keys: 'start'+'end', 'clip_start'+'clip_duration', or 'timestamp'")
-            continue
-
-        output_path = os.path.join(output_dir, f"{prefix}_{i+1}.mp4")
-
-        # Run FFmpeg clip command here (using re-encoding for compatibility)
-        cmd = [
-            "ffmpeg",
-            "-i", video_path,
-            "-ss", str(start_time),
-            "-t", str(duration),
-            "-c:v", "libx264",
-            "-c:a", "aac",
-            "-y",
-            output_path
-        ]
-        
-        print(f"Generating clip {i+1}: {start_time:.2f}s to {start_time + duration:.2f}s -> {output_path}")
-        
-        try:
-            result = subprocess.run(cmd, capture_output=True, text=True, check=True)
-            if os.path.exists(output_path):
-                clip_paths.append(output_path)
-                print(f"  ✓ Clip generated: {output_path}")
-            else:
-                print(f"  ✗ Clip file not created: {output_path}")
-        except subprocess.CalledProcessError as e:
-            print(f"  ✗ FFmpeg error for clip {i+1}: {e.stderr}")
-            continue
-
-    return clip_paths
+    hit_numbers, starts, durations = hits_to_soa(hits)
+    return get_video_clips_from_hits_soa(
+        video_path, hit_numbers, starts, durations, output_dir,
+        prefix=prefix, max_workers=max_workers, reencode=reencode
+    )
 
 
 # Example usage
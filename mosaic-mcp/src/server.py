@@ -11,13 +11,24 @@ Tool7 : list_videos
 
 from mcp.server.fastmcp import FastMCP
 import os
-import json
+import hashlib
+import orjson
+import anyio
+import queue
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future
+from functools import lru_cache
+from pathlib import Path
 from dotenv import load_dotenv
-from typing import List, Dict, Optional
-from fastapi import Request
-from starlette.responses import JSONResponse
-from video_processor import VideoProcessingPipeline
-from search_engine import MultimodalSearchEngine , get_video_clips_from_hits
+from typing import Callable, List, Dict, Optional
+from fastapi import HTTPException, Request
+from starlette.responses import Response, StreamingResponse
+from search_engine import MultimodalSearchEngine, hits_to_soa, get_video_clips_from_hits_soa
+from search_engine import device as engine_device
+from query_cache import cache_stats
+from encoders import CLIP_BACKEND
 
 load_dotenv()
 
@@ -27,10 +38,133 @@ mcp = FastMCP(
 )
 
 storage_dir = os.path.abspath(os.getenv("STORAGE_DIR", "storage/frames"))
-video_processor = VideoProcessingPipeline(storage_dir=storage_dir)
-search_engine = MultimodalSearchEngine(storage_dir=storage_dir)
+STORAGE = Path(storage_dir)
 
 
+# ============== Lazy Model State ==============
+# The pipeline and search engine (CLIP, MiniLM, ChromaDB) are built on first use
+# rather than at import: spawned uvicorn workers import this module twice
+# (__mp_main__ and "server"), and only the copy actually serving should load models.
+_search_engine: Optional[MultimodalSearchEngine] = None
+_pipeline = None
+_state_lock = threading.Lock()
+
+
+def get_search_engine() -> MultimodalSearchEngine:
+    """Return the process-wide search engine, loading its encoders on first call."""
+    global _search_engine
+    if _search_engine is None:
+        with _state_lock:
+            if _search_engine is None:
+                _search_engine = MultimodalSearchEngine(storage_dir=storage_dir, backend=CLIP_BACKEND)
+    return _search_engine
+
+
+def get_pipeline():
+    """Return the process-wide video processing pipeline, importing (and loading) its models on first call."""
+    global _pipeline
+    if _pipeline is None:
+        with _state_lock:
+            if _pipeline is None:
+                from video_processor import VideoProcessingPipeline
+                _pipeline = VideoProcessingPipeline(storage_dir=storage_dir)
+    return _pipeline
+
+
+def reset_search_engine():
+    """Drop the search engine so the next call rebuilds it with fresh in-memory state."""
+    global _search_engine
+    with _state_lock:
+        _search_engine = None
+
+
+MAX_K = 100
+TOOL_THREAD_LIMIT = int(os.getenv("MOSAIC_TOOL_THREADS", "64"))
+MIN_FPS, MAX_FPS = 1.0, 240.0
+
+
+# ============== Input Validation ==============
+def _assert_video(video_id: str) -> Path:
+    """
+    Cheap pre-check run before touching the search engine.
+    Rejects ids that escape the storage directory and videos that were never processed.
+    """
+    if not video_id or video_id in (".", "..") or "/" in video_id or "\\" in video_id:
+        raise ValueError(f"Invalid video_id: {video_id!r}")
+    video_dir = STORAGE / video_id
+    if not video_dir.is_dir():
+        raise FileNotFoundError(f"Video '{video_id}' has not been processed")
+    return video_dir
+
+
+def _clamp_k(k: int) -> int:
+    return max(1, min(int(k), MAX_K))
+
+
+def _clamp_fps(fps: float) -> float:
+    return max(MIN_FPS, min(float(fps), MAX_FPS))
+
+
+# ============== Search Deduplication ==============
+# Identical concurrent searches share one computation (single-flight) and
+# close-in-time repeats are answered from a small TTL cache.
+SEARCH_CACHE_TTL = float(os.getenv("MOSAIC_SEARCH_CACHE_TTL", "60"))
+SEARCH_CACHE_SIZE = 1024
+
+_inflight: Dict[tuple, Future] = {}
+_search_cache: "OrderedDict[tuple, tuple]" = OrderedDict()
+_search_lock = threading.Lock()
+
+
+def _single_flight(key: tuple, fn, **kwargs):
+    """
+    Run fn(**kwargs) once per key among concurrent callers.
+    Followers block on the leader's future; exceptions are shared but not cached.
+    """
+    with _search_lock:
+        cached = _search_cache.get(key)
+        if cached is not None and cached[0] > time.monotonic():
+            _search_cache.move_to_end(key)
+            return cached[1]
+        future = _inflight.get(key)
+        is_leader = future is None
+        if is_leader:
+            future = Future()
+            _inflight[key] = future
+
+    if not is_leader:
+        return future.result()
+
+    try:
+        result = fn(**kwargs)
+    except BaseException as e:
+        with _search_lock:
+            _inflight.pop(key, None)
+        future.set_exception(e)
+        raise
+
+    with _search_lock:
+        _inflight.pop(key, None)
+        # Engine-level failures come back as [{"error": ...}]; never cache those
+        failed = isinstance(result, list) and bool(result) and "error" in result[0]
+        if SEARCH_CACHE_TTL > 0 and not failed:
+            _search_cache[key] = (time.monotonic() + SEARCH_CACHE_TTL, result)
+            _search_cache.move_to_end(key)
+            while len(_search_cache) > SEARCH_CACHE_SIZE:
+                _search_cache.popitem(last=False)
+    future.set_result(result)
+    return result
+
+
+def _invalidate_search_cache():
+    """Drop cached search results (after a video is processed or storage is cleared)."""
+    with _search_lock:
+        _search_cache.clear()
+
+
+def _file_key(path: str) -> tuple:
+    """Cache key part for a query file: path plus mtime, so edited files are re-searched."""
+    return (path, os.stat(path).st_mtime_ns)
 
 
 # ============== TOOL 1: Video Processor ==============
@@ -39,7 +173,12 @@ search_engine = MultimodalSearchEngine(storage_dir=storage_dir)
     description="Process a video to extract frames, transcripts, captions, and audio. and store the embeddings for search.",
     
 )
-def process_video(video_path: str, video_id: str) -> Dict:
+def process_video(
+    video_path: str,
+    video_id: str,
+    batch_size: int = 256,
+    precision: Optional[str] = None
+) -> Dict:
     """
     Process and index a video file.
     Extracts keyframes, generates captions, transcribes audio,
@@ -48,16 +187,34 @@ def process_video(video_path: str, video_id: str) -> Dict:
     Args:
         video_path: Path to the video file to process
         video_id: Unique identifier for this video
+        batch_size: Frames per CLIP encoding batch (default: 256)
+        precision: CLIP weight precision on GPU - fp16, bf16 or fp32 (default: MOSAIC_ENCODER_PRECISION)
         
     Returns:
         Dictionary with processing status, statistics, and transcript.
     """
 
+    return _run_process_video(video_path, video_id, batch_size, precision)
+
+
+def _run_process_video(
+    video_path: str,
+    video_id: str,
+    batch_size: int = 256,
+    precision: Optional[str] = None,
+    progress_cb=None
+) -> Dict:
+    """Run the processing pipeline and invalidate caches holding the old index/results."""
     try:
-        result = video_processor.process_video(
+        result = get_pipeline().process_video(
             video_path = video_path,
             video_id = video_id,
+            batch_size = batch_size,
+            precision = precision,
+            progress_cb = progress_cb,
             )
+        get_search_engine().invalidate_index(video_id)
+        _invalidate_search_cache()
         
         return result
 
@@ -90,7 +247,11 @@ def search_text(query: str, video_id: str, k: int = 2) -> List[Dict]:
         List of matching transcript segments with start/end times and distances
     """
     try:
-        results = search_engine.search_text(
+        _assert_video(video_id)
+        k = _clamp_k(k)
+        results = _single_flight(
+            ("search_text", query, video_id, k),
+            get_search_engine().search_text,
             query = query,
             video_id= video_id,
             k = k
@@ -130,7 +291,13 @@ def search_image(
         List of similar frames with paths, distances, timestamps, and clip parameters
     """
     try:
-        results = search_engine.search_image(
+        _assert_video(video_id)
+        if not os.path.isfile(query_image_path):
+            raise FileNotFoundError(f"Query image not found: {query_image_path}")
+        k, fps = _clamp_k(k), _clamp_fps(fps)
+        results = _single_flight(
+            ("search_image", _file_key(query_image_path), video_id, k, fps),
+            get_search_engine().search_image,
             query_image_path = query_image_path,
             video_id= video_id,
             k = k,
@@ -170,7 +337,11 @@ def search_caption(
         List of matching frames with captions, paths, timestamps, and clip parameters
     """
     try:
-        results = search_engine.search_caption(
+        _assert_video(video_id)
+        k, fps = _clamp_k(k), _clamp_fps(fps)
+        results = _single_flight(
+            ("search_caption", query, video_id, k, fps),
+            get_search_engine().search_caption,
             query=query,
             video_id=video_id,
             k=k,
@@ -211,7 +382,11 @@ def search_visual(
         List of matching frames with paths, distances, timestamps, and clip parameters
     """
     try:
-        results = search_engine.search_visual(
+        _assert_video(video_id)
+        k, fps = _clamp_k(k), _clamp_fps(fps)
+        results = _single_flight(
+            ("search_visual", query, video_id, k, fps),
+            get_search_engine().search_visual,
             query_text=query,
             video_id=video_id,
             k=k,
@@ -236,7 +411,8 @@ def generate_clips(
     video_path: str,
     hits: List[Dict],
     output_dir: str,
-    prefix: str = "clip"
+    prefix: str = "clip",
+    reencode: bool = False
 ) -> Dict:
     """
     Extract video clips from search results.
@@ -247,6 +423,7 @@ def generate_clips(
         hits: List of search hits with timing information (from search tools)
         output_dir: Directory to save the clipped video files
         prefix: Prefix for clip filenames (default: "clip")
+        reencode: Re-encode for frame-accurate cuts; default stream-copies (fast, keyframe-aligned)
         
     Returns:
         Dictionary with list of generated clip paths and count
@@ -264,11 +441,16 @@ def generate_clips(
         print(f"Output directory: {output_dir}")
         print(f"Number of hits: {len(hits)}")
         
-        clip_paths = get_video_clips_from_hits(
+        # Parallel start/duration columns instead of per-hit dict lookups
+        hit_numbers, starts, durations = hits_to_soa(hits)
+        clip_paths = get_video_clips_from_hits_soa(
             video_path=video_path,
-            hits=hits,
+            hit_numbers=hit_numbers,
+            starts=starts,
+            durations=durations,
             output_dir=output_dir,
-            prefix=prefix
+            prefix=prefix,
+            reencode=reencode
         )
         return {
             "status": "success",
@@ -284,6 +466,47 @@ def generate_clips(
         }
     
 # ===== Tool 6: Get Video Info =====
+# frames dir -> (st_mtime_ns, frame count); a directory's mtime changes whenever
+# entries are added or removed, so an unchanged mtime means an unchanged count
+_dir_cache: Dict[str, tuple] = {}
+
+
+def _cached_frame_count(frames_dir: str) -> int:
+    """
+    Number of .jpg frames in frames_dir, rescanned only when the directory mtime changes.
+    """
+    try:
+        mtime = os.stat(frames_dir).st_mtime_ns
+    except FileNotFoundError:
+        _dir_cache.pop(frames_dir, None)
+        return 0
+
+    cached = _dir_cache.get(frames_dir)
+    if cached is not None and cached[0] == mtime:
+        return cached[1]
+
+    with os.scandir(frames_dir) as frames:
+        frame_count = sum(1 for f in frames if f.is_file() and f.name.endswith('.jpg'))
+    _dir_cache[frames_dir] = (mtime, frame_count)
+    return frame_count
+
+
+def _scan_video_dir(video_dir: Path):
+    """
+    Single scandir pass over a video directory.
+    Returns (faiss index exists, number of extracted .jpg frames).
+    """
+    index_exists = False
+    frame_count = 0
+    with os.scandir(video_dir) as entries:
+        for entry in entries:
+            if entry.name == "faiss_index.bin":
+                index_exists = True
+            elif entry.name == "frames" and entry.is_dir():
+                frame_count = _cached_frame_count(entry.path)
+    return index_exists, frame_count
+
+
 @mcp.tool(
     name="get_video_info",
     description="Get information about a processed video, including frame count and index paths.",
@@ -300,12 +523,9 @@ def get_video_info(video_id: str) -> Dict:
         Dictionary with video information and processing status
     """
     try:
-        video_dir = os.path.join(storage_dir, video_id)
-        frames_dir = os.path.join(video_dir, "frames")
-        faiss_index_path = os.path.join(video_dir, "faiss_index.bin")
-        video_info_path = os.path.join(video_dir, "video_info.json")
-        
-        if not os.path.exists(video_dir):
+        try:
+            video_dir = _assert_video(video_id)
+        except FileNotFoundError:
             return {
                 "status": "not_found",
                 "video_id": video_id,
@@ -314,24 +534,22 @@ def get_video_info(video_id: str) -> Dict:
         
         # Load video info if available
         video_path = None
-        if os.path.exists(video_info_path):
-            with open(video_info_path, "r") as f:
-                info = json.load(f)
-                video_path = info.get("video_path")
+        try:
+            info = orjson.loads((video_dir / "video_info.json").read_bytes())
+            video_path = info.get("video_path")
+        except FileNotFoundError:
+            pass
         
-        frame_count = len([
-            f for f in os.listdir(frames_dir) 
-            if f.endswith('.jpg')
-        ]) if os.path.exists(frames_dir) else 0
+        index_exists, frame_count = _scan_video_dir(video_dir)
         
         return {
             "status": "found",
             "video_id": video_id,
             "frame_count": frame_count,
-            "faiss_index_exists": os.path.exists(faiss_index_path),
+            "faiss_index_exists": index_exists,
             "transcript_collection": f"video_{video_id}",
             "frames_collection": f"frames_{video_id}",
-            "storage_path": video_dir,
+            "storage_path": str(video_dir),
             "video_path": video_path
         }
     except Exception as e:
@@ -354,7 +572,7 @@ def list_videos() -> Dict:
         Dictionary with list of video IDs and their processing status
     """
     try:
-        if not os.path.exists(storage_dir):
+        if not STORAGE.is_dir():
             return {
                 "status": "success",
                 "videos": [],
@@ -362,20 +580,15 @@ def list_videos() -> Dict:
             }
         
         videos = []
-        for video_id in os.listdir(storage_dir):
-            video_path = os.path.join(storage_dir, video_id)
-            if os.path.isdir(video_path):
-                faiss_index = os.path.join(video_path, "faiss_index.bin")
-                frames_dir = os.path.join(video_path, "frames")
-                
-                videos.append({
-                    "video_id": video_id,
-                    "indexed": os.path.exists(faiss_index),
-                    "frame_count": len([
-                        f for f in os.listdir(frames_dir) 
-                        if f.endswith('.jpg')
-                    ]) if os.path.exists(frames_dir) else 0
-                })
+        with os.scandir(STORAGE) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    index_exists, frame_count = _scan_video_dir(entry.path)
+                    videos.append({
+                        "video_id": entry.name,
+                        "indexed": index_exists,
+                        "frame_count": frame_count
+                    })
         
         return {
             "status": "success",
@@ -389,7 +602,102 @@ def list_videos() -> Dict:
         }
 
 
+# ===== Cached REST responses for Tools 6/7 =====
+# key -> (directory mtime stamp, serialized JSON); polled endpoints are served
+# from the cached bytes until a relevant directory changes
+_resp_cache: Dict[str, tuple] = {}
+
+
+def _mtime_ns(path) -> int:
+    try:
+        return os.stat(path).st_mtime_ns
+    except FileNotFoundError:
+        return 0
+
+
+def _cached_response(key: str, stamp: tuple, build) -> bytes:
+    """
+    Return the cached JSON bytes for key if stamp is unchanged, else rebuild.
+    Only successful results are cached.
+    """
+    entry = _resp_cache.get(key)
+    if entry is not None and entry[0] == stamp:
+        return entry[1]
+    result = build()
+    buf = orjson.dumps(result)
+    if result.get("status") in ("success", "found"):
+        _resp_cache[key] = (stamp, buf)
+    return buf
+
+
+def list_videos_response() -> bytes:
+    """Serialized list_videos result, keyed on the storage, video and frames dir mtimes."""
+    stamp = [_mtime_ns(STORAGE)]
+    if STORAGE.is_dir():
+        with os.scandir(STORAGE) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    stamp.append((
+                        entry.name,
+                        entry.stat().st_mtime_ns,
+                        _mtime_ns(os.path.join(entry.path, "frames"))
+                    ))
+    return _cached_response("list", tuple(stamp), list_videos)
+
+
+def video_info_response(video_id: str) -> bytes:
+    """Serialized get_video_info result, keyed on the video dir, frames dir and video_info.json mtimes."""
+    video_dir = STORAGE / video_id
+    stamp = (
+        _mtime_ns(video_dir),
+        _mtime_ns(video_dir / "frames"),
+        _mtime_ns(video_dir / "video_info.json")
+    )
+    return _cached_response(f"info:{video_id}", stamp, lambda: get_video_info(video_id))
+
+
 # ===== Tool 8: Clear Storage =====
+def _count_files(dir_path: str) -> int:
+    """Count regular files under dir_path with an iterative scandir walk."""
+    count = 0
+    stack = [dir_path]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                elif entry.is_file(follow_symlinks=False):
+                    count += 1
+    return count
+
+
+def _clear_one(dir_path: str):
+    """
+    Empty a single storage root: count its files, then remove its children.
+    The root itself is kept, since it may be a volume mount point (e.g. chroma_db
+    in docker-compose) and keeps its owner and mode.
+    
+    Returns:
+        Tuple of (cleared, file_count, error message or None)
+    """
+    import shutil
+    
+    if not os.path.isdir(dir_path):
+        return False, 0, None
+    try:
+        file_count = _count_files(dir_path)
+        with os.scandir(dir_path) as it:
+            entries = list(it)
+        for entry in entries:
+            if entry.is_dir(follow_symlinks=False):
+                shutil.rmtree(entry.path)
+            else:
+                os.unlink(entry.path)
+        return True, file_count, None
+    except Exception as e:
+        return False, 0, f"Error clearing {dir_path}: {str(e)}"
+
+
 @mcp.tool(
     name="clear_storage",
     description="Clear all storage directories including frames, clips, and vector databases.",
@@ -398,11 +706,12 @@ def clear_storage() -> Dict:
     """
     Clear all storage directories in the MCP server.
     This includes extracted frames, ChromaDB, clips output, etc.
+    Roots are cleared concurrently, one thread per directory.
     
     Returns:
         Dictionary with clearing status and statistics
     """
-    import shutil
+    from concurrent.futures import ThreadPoolExecutor, as_completed
     
     # Define directories to clear (relative to server.py location)
     server_dir = os.path.dirname(os.path.abspath(__file__))
@@ -414,6 +723,8 @@ def clear_storage() -> Dict:
         os.path.join(server_dir, "mosaic", "extracted_frames"),
         storage_dir,  # The configured storage directory
     ]
+    # The configured storage dir may coincide with a default one
+    dirs_to_clear = list(dict.fromkeys(dirs_to_clear))
     
     stats = {
         "status": "success",
@@ -423,28 +734,22 @@ def clear_storage() -> Dict:
     }
     
     try:
-        for dir_path in dirs_to_clear:
-            if os.path.exists(dir_path) and os.path.isdir(dir_path):
-                try:
-                    # Count files before clearing
-                    file_count = sum(1 for _ in os.walk(dir_path) for _ in _[2])
-                    stats["files_deleted"] += file_count
-                    
-                    # Remove all contents but keep the directory
-                    for item in os.listdir(dir_path):
-                        item_path = os.path.join(dir_path, item)
-                        if os.path.isdir(item_path):
-                            shutil.rmtree(item_path)
-                        else:
-                            os.remove(item_path)
-                    
+        with ThreadPoolExecutor(max_workers=len(dirs_to_clear)) as executor:
+            futures = {executor.submit(_clear_one, d): d for d in dirs_to_clear}
+            for future in as_completed(futures):
+                cleared, file_count, error = future.result()
+                if cleared:
                     stats["directories_cleared"] += 1
-                except Exception as e:
-                    stats["errors"].append(f"Error clearing {dir_path}: {str(e)}")
+                    stats["files_deleted"] += file_count
+                if error:
+                    stats["errors"].append(error)
         
         # Reinitialize search engine to clear in-memory state
-        global search_engine
-        search_engine = MultimodalSearchEngine(storage_dir=storage_dir)
+        _cached_summary.cache_clear()
+        _dir_cache.clear()
+        _resp_cache.clear()
+        _invalidate_search_cache()
+        reset_search_engine()
         
         return stats
     except Exception as e:
@@ -454,6 +759,52 @@ def clear_storage() -> Dict:
         }
     
 # ================ Summerization Tool (Optional) ================
+def _summary_cache_path(video_id: str, max_length: int) -> str:
+    """
+    Disk cache path for a video summary.
+    The key includes the transcript hash from index_complete.json, which
+    process_video writes only after the transcript is indexed, so a summary
+    generated mid-reprocess is never reused for the new transcript.
+    Videos processed before the marker existed fall back to video_info.json's mtime.
+    """
+    video_dir = os.path.join(storage_dir, video_id)
+    marker_path = os.path.join(video_dir, "index_complete.json")
+    video_info_path = os.path.join(video_dir, "video_info.json")
+    if os.path.exists(marker_path):
+        with open(marker_path, "rb") as f:
+            transcript_version = orjson.loads(f.read()).get("transcript_hash")
+    elif os.path.exists(video_info_path):
+        transcript_version = os.stat(video_info_path).st_mtime_ns
+    else:
+        transcript_version = 0
+    key = hashlib.blake2b(
+        f"{video_id}:{max_length}:{transcript_version}".encode(),
+        digest_size=16
+    ).hexdigest()
+    return os.path.join(video_dir, "summaries", f"{key}.json")
+
+
+@lru_cache(maxsize=256)
+def _cached_summary(video_id: str, max_length: int, cache_path: str) -> Dict:
+    """
+    Return the summary for (video_id, max_length), reading it from the
+    on-disk cache when present and generating + persisting it otherwise.
+    """
+    if os.path.exists(cache_path):
+        with open(cache_path, "rb") as f:
+            return orjson.loads(f.read())
+
+    summary = get_search_engine().summarize_video(
+        video_id=video_id,
+        max_length=max_length
+    )
+
+    os.makedirs(os.path.dirname(cache_path), exist_ok=True)
+    with open(cache_path, "wb") as f:
+        f.write(orjson.dumps(summary))
+    return summary
+
+
 @mcp.tool(
     name="summarize_video",
     description="Generate a summary of the video content using its transcript.",
@@ -461,6 +812,7 @@ def clear_storage() -> Dict:
 def summarize_video(video_id: str, max_length: int = 150) -> Dict:
     """
     Summarize video content using its transcript.
+    Summaries are cached per (video_id, max_length) on disk and in memory.
     
     Args:
         video_id: ID of the video to summarize
@@ -470,9 +822,11 @@ def summarize_video(video_id: str, max_length: int = 150) -> Dict:
         Dictionary with summary text and status
     """
     try:
-        summary = search_engine.summarize_video(
-            video_id=video_id,
-            max_length=max_length
+        _assert_video(video_id)
+        summary = _cached_summary(
+            video_id,
+            max_length,
+            _summary_cache_path(video_id, max_length)
         )
         return {
             "status": "success",
@@ -506,7 +860,13 @@ def search_audio(audio_path: str, video_id: str, k: int = 5) -> List[Dict]:
         List of matching transcript segments with timestamps
     """
     try:
-        results = search_engine.search_audio(
+        _assert_video(video_id)
+        if not os.path.isfile(audio_path):
+            raise FileNotFoundError(f"Query audio not found: {audio_path}")
+        k = _clamp_k(k)
+        results = _single_flight(
+            ("search_audio", _file_key(audio_path), video_id, k),
+            get_search_engine().search_audio,
             audio_path=audio_path,
             video_id=video_id,
             k=k
@@ -524,18 +884,17 @@ def search_audio(audio_path: str, video_id: str, k: int = 5) -> List[Dict]:
 # Resources expose data to LLMs (similar to GET endpoints)
 
 @mcp.resource("video://{video_id}/transcript")
-def get_video_transcript(video_id: str) -> str:
+async def get_video_transcript(video_id: str) -> str:
     """
     Get the full transcript of a video.
+    The file read is awaited so multi-MB transcripts don't block the event loop.
     """
     try:
-        video_dir = os.path.join(storage_dir, video_id)
-        video_info_path = os.path.join(video_dir, "video_info.json")
+        video_info_path = anyio.Path(storage_dir) / video_id / "video_info.json"
         
-        if os.path.exists(video_info_path):
-            with open(video_info_path, "r") as f:
-                info = json.load(f)
-                return info.get("transcript", "Transcript not available")
+        if await video_info_path.exists():
+            info = orjson.loads(await video_info_path.read_bytes())
+            return info.get("transcript", "Transcript not available")
         return f"Video {video_id} not found or not processed"
     except Exception as e:
         return f"Error reading transcript: {str(e)}"
@@ -552,21 +911,18 @@ def get_video_metadata(video_id: str) -> str:
         faiss_index_path = os.path.join(video_dir, "faiss_index.bin")
         
         if not os.path.exists(video_dir):
-            return json.dumps({"status": "not_found", "video_id": video_id})
+            return orjson.dumps({"status": "not_found", "video_id": video_id}).decode()
         
-        frame_count = len([
-            f for f in os.listdir(frames_dir) 
-            if f.endswith('.jpg')
-        ]) if os.path.exists(frames_dir) else 0
+        frame_count = _cached_frame_count(frames_dir)
         
-        return json.dumps({
+        return orjson.dumps({
             "video_id": video_id,
             "frame_count": frame_count,
             "indexed": os.path.exists(faiss_index_path),
             "storage_path": video_dir
-        })
+        }).decode()
     except Exception as e:
-        return json.dumps({"error": str(e), "video_id": video_id})
+        return orjson.dumps({"error": str(e), "video_id": video_id}).decode()
 
 
 @mcp.resource("video://list")
@@ -576,15 +932,23 @@ def get_all_videos() -> str:
     """
     try:
         if not os.path.exists(storage_dir):
-            return json.dumps({"videos": [], "count": 0})
+            return orjson.dumps({"videos": [], "count": 0}).decode()
         
         videos = [
             video_id for video_id in os.listdir(storage_dir)
             if os.path.isdir(os.path.join(storage_dir, video_id))
         ]
-        return json.dumps({"videos": videos, "count": len(videos)})
+        return orjson.dumps({"videos": videos, "count": len(videos)}).decode()
     except Exception as e:
-        return json.dumps({"error": str(e)})
+        return orjson.dumps({"error": str(e)}).decode()
+
+
+@mcp.resource("cache://stats")
+def get_cache_stats() -> str:
+    """
+    Get hit/miss statistics for the query embedding caches.
+    """
+    return orjson.dumps(cache_stats()).decode()
 
 
 # ============== MCP PROMPTS ==============
@@ -624,105 +988,202 @@ def clip_workflow_prompt(search_query: str) -> str:
 4. Report the generated clip paths to the user"""
 
 
-def main(transport="http", port=9090, host="127.0.0.1"):
+# Legacy REST endpoint name -> tool function. list_videos/get_video_info are
+# served from their cached, pre-serialized responses.
+TOOL_TABLE: Dict[str, Callable] = {
+    "process_video": process_video,
+    "search_text": search_text,
+    "search_image": search_image,
+    "search_caption": search_caption,
+    "search_visual": search_visual,
+    "generate_clips": generate_clips,
+    "get_video_info": video_info_response,
+    "list_videos": list_videos_response,
+    "summarize_video": summarize_video,
+    "clear_storage": clear_storage,
+    "search_audio": search_audio,
+}
+
+
+def _json_response(result) -> Response:
+    """Serialize a tool result with orjson; NumPy scalars/arrays in hits are encoded natively."""
+    return Response(
+        orjson.dumps(result, option=orjson.OPT_SERIALIZE_NUMPY),
+        media_type="application/json"
+    )
+
+
+def create_app():
+    """Build the FastAPI app: legacy REST tool endpoints plus the mounted MCP protocol app.
+    
+    Module-level so uvicorn can import it as a factory ("server:create_app")
+    when running with multiple worker processes.
+    """
+    from contextlib import asynccontextmanager
+    from fastapi import FastAPI
+    from starlette.concurrency import run_in_threadpool
+
+    @asynccontextmanager
+    async def lifespan(app):
+        # Tool calls run in the threadpool; allow more of them to run concurrently
+        anyio.to_thread.current_default_thread_limiter().total_tokens = TOOL_THREAD_LIMIT
+        # Load models once per worker before serving (no-op when preloaded in the master)
+        await run_in_threadpool(get_search_engine)
+        await run_in_threadpool(get_pipeline)
+        yield
+    
+    # Use FastMCP's native HTTP transport with custom FastAPI app
+    app = FastAPI(title="Mosaic MCP Server", lifespan=lifespan)
+
+    # Define REST endpoints FIRST (before mount) to ensure they take priority
+    # These are legacy endpoints kept for backward compatibility
+    # One parameterized route dispatches through TOOL_TABLE instead of a route per tool
+    # Blocking tool calls run in the threadpool so the event loop stays free
+    @app.post("/mcp/v1/tools/process_video/stream")
+    async def handle_process_video_stream(request: Request):
+        """Run process_video in the background, streaming stage progress as Server-Sent Events."""
+        data = orjson.loads(await request.body())
+        events = queue.Queue()
+
+        def run():
+            try:
+                result = _run_process_video(**data, progress_cb=events.put)
+            except Exception as e:  # e.g. bad arguments; the stream must still terminate
+                result = {"status": "error", "error": str(e), "video_id": data.get("video_id")}
+            events.put({"stage": "complete", "result": result})
+            events.put(None)
+
+        threading.Thread(target=run, name=f"process_video-{data.get('video_id')}", daemon=True).start()
+
+        async def event_gen():
+            while True:
+                event = await run_in_threadpool(events.get)
+                if event is None:
+                    break
+                yield b"data: " + orjson.dumps(event, option=orjson.OPT_SERIALIZE_NUMPY) + b"\n\n"
+
+        return StreamingResponse(event_gen(), media_type="text/event-stream")
+
+    @app.post("/mcp/v1/tools/{tool_name}")
+    async def handle_tool(tool_name: str, request: Request):
+        fn = TOOL_TABLE.get(tool_name)
+        if fn is None:
+            raise HTTPException(status_code=404, detail=f"Unknown tool: {tool_name}")
+        raw = await request.body()
+        data = orjson.loads(raw) if raw.strip() else {}
+        result = await run_in_threadpool(fn, **data)
+        if isinstance(result, bytes):  # cached, pre-serialized response
+            return Response(result, media_type="application/json")
+        return _json_response(result)
+
+    @app.get("/")
+    async def root():
+        return {
+            "status": "ok", 
+            "message": "Mosaic MCP Server Running", 
+            "transport": "http",
+            "mcp_endpoint": "/mcp"
+        }
+
+    @app.get("/health")
+    async def health():
+        return {"status": "healthy"}
+
+    # Mount MCP protocol endpoint AFTER defining REST routes
+    # This ensures REST routes take priority for specific paths
+    mcp_app = mcp.streamable_http_app()
+    app.mount("/mcp/protocol", mcp_app)
+
+    return app
+
+
+def _serve_preforked(app, host: str, port: int, workers: int):
+    """Serve the app from gunicorn UvicornWorkers forked after model load.
+    
+    Models are loaded and warmed in this (master) process, then gunicorn's
+    preload mode forks the workers so the read-only weight pages are shared
+    copy-on-write instead of being loaded once per worker.
+    """
+    import multiprocessing
+    from gunicorn.app.base import BaseApplication
+
+    multiprocessing.set_start_method("fork", force=True)
+
+    import video_processor as pipeline_module
+
+    get_search_engine().share_memory()
+    get_pipeline()
+    pipeline_module.clip_model.share_memory()
+    pipeline_module.text_model.share_memory()
+
+    class PreforkApplication(BaseApplication):
+        def load_config(self):
+            self.cfg.set("bind", f"{host}:{port}")
+            self.cfg.set("workers", workers)
+            self.cfg.set("worker_class", "uvicorn.workers.UvicornWorker")
+            self.cfg.set("preload_app", True)
+
+        def load(self):
+            return app
+
+    PreforkApplication().run()
+
+
+def _warm_start():
+    """
+    Materialize FastMCP tool/resource/prompt listings (schema build) and run a
+    dummy encoder pass, so the first real request doesn't pay either cost.
+    """
+    import asyncio
+
+    async def list_registrations():
+        await mcp.list_tools()
+        await mcp.list_resources()
+        await mcp.list_prompts()
+
+    try:
+        asyncio.run(list_registrations())
+        get_search_engine().warmup()
+        print("✓ Tools, resources, prompts and encoders warmed up")
+    except Exception as e:
+        print(f"⚠ Warm-up skipped: {e}")
+
+
+def _install_uvloop() -> bool:
+    """Make uvloop the default asyncio event loop policy when it is installed."""
+    try:
+        import asyncio
+        import uvloop
+    except ImportError:
+        return False
+    asyncio.set_event_loop_policy(uvloop.EventLoopPolicy())
+    return True
+
+
+def main(transport="http", port=9090, host="127.0.0.1", workers=1):
     """Run the MCP server with HTTP or STDIO transport.
     
     HTTP transport: Uses FastMCP's streamable HTTP at /mcp endpoint
     STDIO transport: Uses standard input/output for local subprocess communication
+    
+    With workers > 1 on CPU (and gunicorn installed) the workers are forked after
+    the models are loaded so their weights are shared copy-on-write. Otherwise
+    uvicorn spawns worker processes from the "server:create_app" factory and
+    each worker loads its own models once, in the app lifespan (CUDA cannot be forked).
     """
     import uvicorn
-    from fastapi import FastAPI
+    from importlib.util import find_spec
     
     print(f"Starting Mosaic MCP Server on {host}:{port}")
     print(f"Transport: {transport}")
     
+    # uvloop for both transports (stdio runs on the default policy's loop)
+    has_uvloop = _install_uvloop()
+    
     if transport == "http":
-        # Use FastMCP's native HTTP transport with custom FastAPI app
-        app = FastAPI(title="Mosaic MCP Server")
-        
-        # Define REST endpoints FIRST (before mount) to ensure they take priority
-        # These are legacy endpoints kept for backward compatibility
-        @app.post("/mcp/v1/tools/process_video")
-        async def handle_process_video(request: Request):
-            data = await request.json()
-            result = process_video(**data)
-            return JSONResponse(result)
-
-        @app.post("/mcp/v1/tools/search_text")
-        async def handle_search_text(request: Request):
-            data = await request.json()
-            result = search_text(**data)
-            return JSONResponse(result)
-
-        @app.post("/mcp/v1/tools/search_image")
-        async def handle_search_image(request: Request):
-            data = await request.json()
-            result = search_image(**data)
-            return JSONResponse(result)
-
-        @app.post("/mcp/v1/tools/search_caption")
-        async def handle_search_caption(request: Request):
-            data = await request.json()
-            result = search_caption(**data)
-            return JSONResponse(result)
-
-        @app.post("/mcp/v1/tools/search_visual")
-        async def handle_search_visual(request: Request):
-            data = await request.json()
-            result = search_visual(**data)
-            return JSONResponse(result)
-
-        @app.post("/mcp/v1/tools/generate_clips")
-        async def handle_generate_clips(request: Request):
-            data = await request.json()
-            result = generate_clips(**data)
-            return JSONResponse(result)
-
-        @app.post("/mcp/v1/tools/get_video_info")
-        async def handle_get_video_info(request: Request):
-            data = await request.json()
-            result = get_video_info(**data)
-            return JSONResponse(result)
-
-        @app.post("/mcp/v1/tools/list_videos")
-        async def handle_list_videos(request: Request):
-            result = list_videos()
-            return JSONResponse(result)
-
-        @app.post("/mcp/v1/tools/summarize_video")
-        async def handle_summarize_video(request: Request):
-            data = await request.json()
-            result = summarize_video(**data)
-            return JSONResponse(result)
-
-        @app.post("/mcp/v1/tools/clear_storage")
-        async def handle_clear_storage(request: Request):
-            result = clear_storage()
-            return JSONResponse(result)
-
-        @app.post("/mcp/v1/tools/search_audio")
-        async def handle_search_audio(request: Request):
-            data = await request.json()
-            result = search_audio(**data)
-            return JSONResponse(result)
-
-        @app.get("/")
-        async def root():
-            return {
-                "status": "ok", 
-                "message": "Mosaic MCP Server Running", 
-                "transport": "http",
-                "mcp_endpoint": "/mcp"
-            }
-        
-        @app.get("/health")
-        async def health():
-            return {"status": "healthy"}
-        
-        # Mount MCP protocol endpoint AFTER defining REST routes
-        # This ensures REST routes take priority for specific paths
-        mcp_app = mcp.streamable_http_app()
-        app.mount("/mcp/protocol", mcp_app)
+        # uvloop event loop and httptools parser when installed
+        loop = "uvloop" if has_uvloop else "asyncio"
+        http = "httptools" if find_spec("httptools") else "auto"
 
         print(f"Running HTTP transport on http://{host}:{port}")
         print("Available endpoints:")
@@ -730,15 +1191,33 @@ def main(transport="http", port=9090, host="127.0.0.1"):
         print("  GET  /health - Health check")
         print("  MCP  /mcp/protocol - Standard MCP protocol endpoint")
         print("  POST /mcp/v1/tools/* - Legacy REST endpoints")
-        uvicorn.run(app, host=host, port=port)
+        print(f"Workers: {workers} (loop={loop}, http={http})")
+        if workers > 1 and engine_device == "cpu" and find_spec("gunicorn"):
+            _warm_start()
+            _serve_preforked(create_app(), host=host, port=port, workers=workers)
+        elif workers > 1:
+            # Spawned workers import the module and load their own models at startup
+            uvicorn.run(
+                "server:create_app",
+                factory=True,
+                host=host,
+                port=port,
+                workers=workers,
+                loop=loop,
+                http=http
+            )
+        else:
+            _warm_start()
+            uvicorn.run(create_app(), host=host, port=port, loop=loop, http=http)
         
     elif transport == "stdio":
         # Use FastMCP's built-in stdio transport
         print("Running STDIO transport...")
+        _warm_start()
         mcp.run(transport="stdio")
     else:
         print(f"Unknown transport: {transport}. Using HTTP.")
-        main(transport="http", port=port, host=host)
+        main(transport="http", port=port, host=host, workers=workers)
 
 if __name__ == "__main__":
     import argparse
@@ -747,9 +1226,10 @@ if __name__ == "__main__":
     parser.add_argument("--port", type=int, default=9090, help="Port to run the server on")
     parser.add_argument("--host", default="127.0.0.1", help="Host to bind the server to")
     parser.add_argument("--transport", default="http", choices=["http", "stdio"], help="Transport type (http or stdio)")
+    parser.add_argument("--workers", type=int, default=int(os.getenv("MOSAIC_WORKERS", "1")), help="Number of HTTP worker processes")
     
     args = parser.parse_args()
     
     print(f"Mosaic MCP Server - {args.transport.upper()} Transport on {args.host}:{args.port}")
     
-    main(transport=args.transport, port=args.port, host=args.host)
+    main(transport=args.transport, port=args.port, host=args.host, workers=args.workers)
@@ -12,18 +12,22 @@ Video processing module.
 """
 # Import statements
 import os
+import hashlib
 from concurrent.futures import ThreadPoolExecutor, as_completed
+import struct
+import queue
 import subprocess
 import tempfile
+import threading
 from pathlib import Path
-from typing import List, Dict, Tuple
+from typing import Callable, List, Dict, Optional, Tuple
 from groq import Groq
 from PIL import Image
 import numpy as np
-from sentence_transformers import SentenceTransformer
 import chromadb
-import faiss
 from dotenv import load_dotenv
+from encoders import load_encoder, CLIP_BACKEND, ENCODER_PRECISION
+from faiss_store import FRAME_PATTERN, frame_paths_for, save_embeddings_fp16, store_embeddings_faiss
 import json
 import re
 import base64
@@ -44,16 +48,38 @@ if device == 'cuda':
     print(f"   GPU: {torch.cuda.get_device_name(0)}")
     print(f"   VRAM: {round(torch.cuda.get_device_properties(0).total_memory / 1024**3, 2)} GB")
 
-# models with GPU support
-clip_model = SentenceTransformer('clip-ViT-B-32', device=device)
-text_model = SentenceTransformer('all-MiniLM-L6-v2', device=device)
+# models with GPU support; torch models get fp16 weights on CUDA unless MOSAIC_ENCODER_PRECISION says otherwise
+# CLIP always runs in PyTorch (ONNX does not cover its modules, and the nvJPEG path
+# feeds its vision tower directly); MiniLM uses the configured backend (MOSAIC_CLIP_BACKEND)
+clip_model = load_encoder('clip-ViT-B-32', device, backend="torch", precision=ENCODER_PRECISION)
+TEXT_MODEL_NAME = 'all-MiniLM-L6-v2'
+text_model = load_encoder(TEXT_MODEL_NAME, device, backend=CLIP_BACKEND, precision=ENCODER_PRECISION)
+# Cached text embeddings are only reused under the same encoder configuration (CPU always runs fp32)
+TEXT_ENCODER_TAG = f"{TEXT_MODEL_NAME}|{CLIP_BACKEND}|{ENCODER_PRECISION if device == 'cuda' else 'fp32'}"
+_clip_variants = {}  # precision -> CLIP copy loaded for per-call precision overrides
+_clip_variants_lock = threading.Lock()
 groq_client = Groq(api_key=os.getenv('GROQ_API_KEY'))
 N = 10  # take 1 in every 10th frame
+CLIP_INPUT_SIZE = 224  # CLIP ViT-B/32 input resolution
+
+# FFmpeg only reports errors: no banner or per-frame progress lines to pipe back and buffer
+FFMPEG_QUIET = ["-hide_banner", "-loglevel", "error", "-nostats"]
+
+# Decode frame JPEGs on the GPU (nvJPEG via torchvision) when embedding from disk
+GPU_JPEG_DECODE = os.getenv('GPU_JPEG_DECODE', 'true').lower() == 'true'
+CLIP_MEAN = (0.48145466, 0.4578275, 0.40821073)
+CLIP_STD = (0.26862954, 0.26130258, 0.27577711)
+
+# Frame sampling: "interval" takes 1 in N decoded frames, "iframe" decodes only
+# keyframes (-skip_frame nokey), skipping most of the decode work
+KEYFRAME_MODE = os.getenv('KEYFRAME_MODE', 'interval').lower()
 
 # Vision model for image captioning (Groq supports llama-3.2-90b-vision-preview, meta-llama/llama-4-maverick-17b-128e-instruct
 VISION_MODEL = os.getenv('VISION_MODEL', 'meta-llama/llama-4-maverick-17b-128e-instruct')
 CAPTION_BATCH_SIZE = 5  # Process frames in batches to avoid rate limits
 CAPTION_DELAY = 0.5  # Delay between API calls to avoid rate limiting
+GROQ_MAX_AUDIO_BYTES = 20 * 1024 * 1024  # larger audio is split into chunks (leaves headroom under Groq's limit)
+CHROMA_ADD_BATCH = 5000  # records per ChromaDB add call
 
 
 # Key frame extraction hybrid method (scene change + interval + keuyframe detection)
@@ -78,22 +104,121 @@ CAPTION_DELAY = 0.5  # Delay between API calls to avoid rate limiting
 
 
 # frame extraction
-def extract_keyframes_ffmpeg(video_path: str, output_dir: str) -> Tuple[List[str], List[float]]:
+def extract_keyframes_ffmpeg(
+    video_path: str,
+    output_dir: str,
+    mode: str = KEYFRAME_MODE
+) -> Tuple[List[str], List[float]]:
     """
     Extract keyframes from a video using ffmpeg.
-    extracting 1 in every 10 frames for simplicity.
+    extracting 1 in every 10 frames for simplicity, or only the I-frames in "iframe" mode.
     
     args:
         video_path: path to the input video file
         output_dir: directory to save the extracted frames
+        mode: frame sampling mode, "interval" or "iframe"
     returns:
         Tuple of (List of paths to the extracted frames, List of timestamps in seconds)
     """
 
     os.makedirs(output_dir, exist_ok=True)
-    output_pattern = os.path.join(output_dir, 'frame_%04d.jpg')
+    output_pattern = os.path.join(output_dir, FRAME_PATTERN)
+
+    input_args, select_filter, keyframe_times = _keyframe_sampling(video_path, mode)
+    fps = probe_fps(video_path) if keyframe_times is None else None
+
+    cmd = [
+        "ffmpeg",
+        *FFMPEG_QUIET,
+        *input_args,
+        "-i", video_path,
+        *(["-vf", select_filter] if select_filter else []),
+        "-vsync", "vfr",
+        "-q:v", "2",
+        output_pattern
+    ]
+
+    result = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    if result.returncode != 0:
+        error_msg = f"FFmpeg failed with return code {result.returncode}\nSTDERR: {result.stderr}"
+        raise RuntimeError(error_msg)
+
+    # FFmpeg numbers frames sequentially, so the paths follow from the count
+    frames = frame_paths_for(output_dir, _count_frames(output_dir))
+
+    if keyframe_times is not None:
+        if len(keyframe_times) == len(frames):
+            return frames, keyframe_times
+        print(f"⚠ Probed {len(keyframe_times)} keyframes but extracted {len(frames)}, re-extracting at fixed interval")
+        for frame in frames:
+            os.remove(frame)
+        return extract_keyframes_ffmpeg(video_path, output_dir, mode="interval")
+
+    # Calculate timestamps: frame N corresponds to frame index N*10 in original video
+    # timestamp = frame_index / fps
+    timestamps = []
+    for i in range(len(frames)):
+        original_frame_index = i * N  # Every 10th frame
+        timestamp = original_frame_index / fps
+        timestamps.append(timestamp)
+
+    return frames, timestamps
+
+
+def _count_frames(output_dir: str) -> int:
+    """Count extracted frames with a single directory scan (no name list, no sort)."""
+    with os.scandir(output_dir) as entries:
+        return sum(1 for entry in entries if entry.name.endswith('.jpg'))
 
-    # First, get video FPS
+
+def probe_keyframe_times(video_path: str) -> List[float]:
+    """
+    Get the timestamps (seconds) of the video's keyframes by probing with the
+    decoder skipping non-key frames. Returns an empty list if probing fails.
+    """
+    probe_cmd = [
+        "ffprobe",
+        "-v", "error",
+        "-select_streams", "v:0",
+        "-skip_frame", "nokey",
+        "-show_entries", "frame=best_effort_timestamp_time",
+        "-of", "csv=p=0",
+        video_path
+    ]
+    try:
+        result = subprocess.run(probe_cmd, capture_output=True, text=True, check=True)
+    except (subprocess.CalledProcessError, OSError):
+        return []
+    times = []
+    for line in result.stdout.split():
+        value = line.strip().rstrip(',')
+        if not value or value == 'N/A':
+            return []  # untimed keyframes: timestamps wouldn't line up with frames
+        times.append(float(value))
+    return times
+
+
+def _keyframe_sampling(video_path: str, mode: str):
+    """
+    Resolve the frame sampling mode into ffmpeg arguments.
+    returns:
+        (input args, select filter or None, keyframe timestamps or None)
+        Keyframe timestamps are set only in "iframe" mode; interval mode derives
+        timestamps from the frame rate instead.
+    """
+    if mode == 'iframe':
+        keyframe_times = probe_keyframe_times(video_path)
+        if keyframe_times:
+            print(f"Decoding {len(keyframe_times)} keyframes only")
+            return ["-skip_frame", "nokey"], None, keyframe_times
+        print("⚠ Keyframe probe failed, sampling 1 in every N frames instead")
+    return [], f"select='not(mod(n,{N}))'", None
+
+
+def probe_fps(video_path: str) -> float:
+    """
+    Get the frame rate of the first video stream (30.0 if it can't be probed).
+    """
     probe_cmd = [
         "ffprobe",
         "-v", "error",
@@ -113,56 +238,197 @@ def extract_keyframes_ffmpeg(video_path: str, output_dir: str) -> Tuple[List[str
             fps = float(fps_str) if fps_str else 30.0
     except:
         fps = 30.0  # Default FPS
+    return fps
+
+
+def extract_and_embed_keyframes(
+    video_path: str,
+    output_dir: str,
+    batch_size: int = 256,
+    mode: str = KEYFRAME_MODE,
+    precision: Optional[str] = None
+) -> Tuple[List[str], List[float], np.ndarray]:
+    """
+    Extract keyframes and compute their CLIP embeddings in a single FFmpeg decode.
+    The selected frames are split into two outputs: JPEGs on disk (used for
+    captioning and returned in search hits) and 224x224 RGB frames piped to
+    stdout, which are embedded in batches while FFmpeg is still decoding.
+    This skips re-opening and JPEG-decoding every frame for the encoder.
+
+    args:
+        video_path: path to the input video file
+        output_dir: directory to save the extracted frames
+        batch_size: frames per CLIP encoding batch
+        mode: frame sampling mode, "interval" or "iframe"
+        precision: CLIP weight precision on GPU (fp32, fp16, bf16); None uses MOSAIC_ENCODER_PRECISION
+    returns:
+        Tuple of (frame paths, timestamps in seconds, float32 embeddings of shape (n, dim))
+    """
+    model = clip_encoder(precision)
+    os.makedirs(output_dir, exist_ok=True)
+    output_pattern = os.path.join(output_dir, FRAME_PATTERN)
+    input_args, select_filter, keyframe_times = _keyframe_sampling(video_path, mode)
+    fps = probe_fps(video_path) if keyframe_times is None else None
 
+    # CLIP preprocessing: resize shortest side to 224, center crop 224x224
+    size = CLIP_INPUT_SIZE
+    frame_bytes = size * size * 3
+    filter_graph = (
+        f"[0:v]{select_filter + ',' if select_filter else ''}split=2[jpg][raw];"
+        f"[raw]scale={size}:{size}:force_original_aspect_ratio=increase,crop={size}:{size},format=rgb24[rgb]"
+    )
     cmd = [
         "ffmpeg",
+        *FFMPEG_QUIET,
+        *input_args,
         "-i", video_path,
-        "-vf", "select='not(mod(n,10))'",
+        "-filter_complex", filter_graph,
         "-vsync", "vfr",
-        "-q:v", "2",
-        output_pattern
+        "-map", "[jpg]", "-q:v", "2", output_pattern,
+        "-map", "[rgb]", "-f", "rawvideo", "-pix_fmt", "rgb24", "-"
     ]
 
-    result = subprocess.run(cmd, capture_output=True, text=True)
-    if result.returncode != 0:
-        error_msg = f"FFmpeg failed with return code {result.returncode}\nSTDERR: {result.stderr}\nSTDOUT: {result.stdout}"
-        raise RuntimeError(error_msg)
+    batches = []
+    # stderr goes to a file so a full pipe can't stall FFmpeg while we read stdout
+    with tempfile.TemporaryFile() as stderr_file:
+        process = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=stderr_file)
+        # One RGB frame is larger than the pipe buffer, so the pipe is drained on a
+        # reader thread: FFmpeg keeps decoding while the encoder works on a batch.
+        # The bounded queue caps how far decoding can run ahead of encoding.
+        frames = queue.Queue(maxsize=2 * batch_size)
 
-    frames = sorted([
-        os.path.join(output_dir, f)
-        for f in os.listdir(output_dir)
-        if f.endswith('.jpg')
-    ])
+        def read_frames():
+            try:
+                while True:
+                    buf = process.stdout.read(frame_bytes)
+                    if len(buf) < frame_bytes:
+                        break
+                    frames.put(buf)
+            finally:
+                frames.put(None)
 
-    # Calculate timestamps: frame N corresponds to frame index N*10 in original video
-    # timestamp = frame_index / fps
-    timestamps = []
-    for i in range(len(frames)):
-        original_frame_index = i * N  # Every 10th frame
-        timestamp = original_frame_index / fps
-        timestamps.append(timestamp)
+        reader = threading.Thread(target=read_frames, name="ffmpeg-frame-reader", daemon=True)
+        reader.start()
+        try:
+            images = []
+            with torch.inference_mode():
+                while (buf := frames.get()) is not None:
+                    images.append(Image.frombuffer('RGB', (size, size), buf, 'raw', 'RGB', 0, 1))
+                    if len(images) == batch_size:
+                        batches.append(model.encode(images, batch_size=batch_size, show_progress_bar=False))
+                        images = []
+                if images:
+                    batches.append(model.encode(images, batch_size=batch_size, show_progress_bar=False))
+        except BaseException:
+            # Stop FFmpeg and unblock the reader so neither is left behind
+            process.kill()
+            while reader.is_alive():
+                try:
+                    frames.get(timeout=0.1)
+                except queue.Empty:
+                    pass
+            process.wait()
+            raise
+        finally:
+            reader.join()
+            process.stdout.close()
+        returncode = process.wait()
+        if returncode != 0:
+            stderr_file.seek(0)
+            stderr = stderr_file.read().decode(errors='replace')
+            raise RuntimeError(f"FFmpeg failed with return code {returncode}\nSTDERR: {stderr}")
 
-    return frames, timestamps
+    if batches:
+        embeddings = np.concatenate([np.asarray(b, dtype=np.float32) for b in batches])
+    else:
+        embeddings = np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    # Both outputs come from the same split, so the JPEG paths follow from the piped frame count
+    frames = frame_paths_for(output_dir, len(embeddings))
+    if frames and not os.path.exists(frames[-1]):
+        raise RuntimeError(f"Piped {len(embeddings)} frames but {frames[-1]} was not written")
+
+    if keyframe_times is not None:
+        if len(keyframe_times) == len(frames):
+            return frames, keyframe_times, embeddings
+        print(f"⚠ Probed {len(keyframe_times)} keyframes but extracted {len(frames)}, re-extracting at fixed interval")
+        for frame in frames:
+            os.remove(frame)
+        return extract_and_embed_keyframes(
+            video_path, output_dir, batch_size=batch_size, mode="interval", precision=precision
+        )
+
+    timestamps = [i * N / fps for i in range(len(frames))]
+    return frames, timestamps, embeddings
 
 # extract audio 
-def extract_audio_ffmpeg(video_path: str, output_path: str = None) -> str:
+def extract_audio_ffmpeg(video_path: str, output_path: str = None):
+    """
+    Extract the audio track as 16kHz mono 16-bit WAV.
+    output_path=None writes to a new temp file; output_path="-" returns the
+    WAV bytes from FFmpeg's stdout without touching disk.
+    returns:
+        Path of the written WAV file, or the WAV bytes when output_path is "-"
+    """
     if output_path is None:
-        output_path = tempfile.mktemp(suffix=".wav")
+        fd, output_path = tempfile.mkstemp(suffix=".wav")
+        os.close(fd)
 
+    to_memory = output_path == "-"
     cmd = [
-         "ffmpeg",
+        "ffmpeg",
+        *FFMPEG_QUIET,
         "-i", video_path,
         "-ar", "16000",  # 16kHz sampling rate
         "-ac", "1",      # Mono channel
         "-map", "0:a",   # Audio stream only
         "-c:a", "pcm_s16le",  # WAV format
+        *(["-map_metadata", "-1", "-fflags", "+bitexact", "-f", "wav"] if to_memory else []),
         "-y",            # Overwrite
         output_path
     ]
 
-    subprocess.run(cmd, capture_output=True, check=True)
+    if to_memory:
+        result = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, check=True)
+        return _fix_wav_sizes(bytearray(result.stdout))
+
+    subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
     return output_path
 
+
+def _fix_wav_sizes(wav: bytearray) -> bytes:
+    """
+    Fill in the RIFF and data chunk sizes, which FFmpeg can't seek back to
+    write when the WAV goes to a pipe.
+    """
+    data_offset = wav.find(b"data", 12)
+    if wav[:4] == b"RIFF" and data_offset != -1:
+        struct.pack_into("<I", wav, 4, len(wav) - 8)
+        struct.pack_into("<I", wav, data_offset + 4, len(wav) - data_offset - 8)
+    return bytes(wav)
+
+def extract_and_transcribe_audio(video_path: str, audio_path: str) -> Dict:
+    """
+    Extract the audio track and transcribe it with Groq Whisper.
+    Audio small enough for a single request stays in memory and is uploaded
+    directly; larger audio is written to audio_path and transcribed in chunks.
+    Returns the transcribe_with_groq result (text + segments).
+    """
+    print("Extracting audio...")
+    audio_bytes = extract_audio_ffmpeg(video_path, "-")
+
+    print("Transcribing audio with Groq Whisper...")
+    if len(audio_bytes) > GROQ_MAX_AUDIO_BYTES:
+        with open(audio_path, "wb") as f:
+            f.write(audio_bytes)
+        del audio_bytes
+        transcription_result = transcribe_with_groq(audio_path)
+    else:
+        transcription_result = _transcribe_groq_request(("audio.wav", audio_bytes))
+    print(f"Transcription complete: {len(transcription_result['text'])} characters")
+    return transcription_result
+
+
 def split_audio_into_chunks(audio_path: str, chunk_duration_sec: int = 600) -> List[Tuple[str, float]]:
     """
     Split audio file into chunks of specified duration.
@@ -205,6 +471,7 @@ def split_audio_into_chunks(audio_path: str, chunk_duration_sec: int = 600) -> L
         
         cmd = [
             "ffmpeg",
+            *FFMPEG_QUIET,
             "-i", audio_path,
             "-ss", str(start_time),
             "-t", str(chunk_duration_sec),
@@ -215,7 +482,7 @@ def split_audio_into_chunks(audio_path: str, chunk_duration_sec: int = 600) -> L
             chunk_path
         ]
         
-        subprocess.run(cmd, capture_output=True, check=True)
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, check=True)
         chunks.append((chunk_path, start_time))
         
         start_time += chunk_duration_sec
@@ -235,9 +502,10 @@ def transcribe_with_groq(audio_path: str, language: str = None) -> Dict:
         Dictionary with 'text' and 'segments' keys
     """
     # Check file size - if > 20MB, split into chunks (leaving buffer for safety)
-    file_size_mb = os.path.getsize(audio_path) / (1024 * 1024)
+    file_size = os.path.getsize(audio_path)
+    file_size_mb = file_size / (1024 * 1024)
     
-    if file_size_mb > 20:
+    if file_size > GROQ_MAX_AUDIO_BYTES:
         print(f"Audio file is {file_size_mb:.1f}MB, splitting into chunks...")
         chunks = split_audio_into_chunks(audio_path, chunk_duration_sec=600)  # 10-minute chunks
         print(f"Split into {len(chunks)} chunks")
@@ -254,7 +522,7 @@ def transcribe_with_groq(audio_path: str, language: str = None) -> Dict:
                         file=audio_file,
                         model="whisper-large-v3-turbo",
                         response_format="verbose_json",
-                        timestamp_granularities=["word", "segment"],
+                        timestamp_granularities=["segment"],
                         language=language,
                         temperature=0.0
                     )
@@ -291,75 +559,194 @@ def transcribe_with_groq(audio_path: str, language: str = None) -> Dict:
     else:
         # File is small enough, transcribe directly
         with open(audio_path, "rb") as audio_file:
-            transcription = groq_client.audio.transcriptions.create(
-                file=audio_file,
-                model="whisper-large-v3-turbo",
-                response_format="verbose_json",
-                timestamp_granularities=["word", "segment"],
-                language=language,
-                temperature=0.0
-            )
-        
-        return {
-            "text": transcription.text,
-            "segments": [
-                {
-                    "text": seg.get("text", ""),
-                    "start": seg.get("start", 0),
-                    "end": seg.get("end", 0)
-                }
-                for seg in transcription.segments
-            ] if hasattr(transcription, 'segments') else []
-        }
+            return _transcribe_groq_request(audio_file, language)
+
+
+def _transcribe_groq_request(audio_file, language: str = None) -> Dict:
+    """
+    Single Groq Whisper request for audio under the upload limit.
+    audio_file is an open file or a (filename, bytes) tuple.
+    """
+    transcription = groq_client.audio.transcriptions.create(
+        file=audio_file,
+        model="whisper-large-v3-turbo",
+        response_format="verbose_json",
+        timestamp_granularities=["segment"],
+        language=language,
+        temperature=0.0
+    )
+    
+    return {
+        "text": transcription.text,
+        "segments": [
+            {
+                "text": seg.get("text", ""),
+                "start": seg.get("start", 0),
+                "end": seg.get("end", 0)
+            }
+            for seg in transcription.segments
+        ] if hasattr(transcription, 'segments') else []
+    }
 
 
 # Embedding Function
-def generate_image_embeddings(image_paths: List[str]) -> np.ndarray:
+def clip_encoder(precision: Optional[str] = None):
+    """
+    CLIP encoder with weights in the given precision (fp32, fp16, bf16).
+    None or MOSAIC_ENCODER_PRECISION returns the shared module-level model; other
+    precisions load a separate copy on first use and reuse it afterwards.
+    CPU inference always runs in fp32.
+    """
+    precision = (precision or ENCODER_PRECISION).lower()
+    if precision not in ("fp32", "fp16", "bf16"):
+        raise ValueError(f"Unsupported precision: {precision!r} (use fp32, fp16 or bf16)")
+    if precision == ENCODER_PRECISION or device != 'cuda':
+        return clip_model
+    with _clip_variants_lock:
+        model = _clip_variants.get(precision)
+        if model is None:
+            model = load_encoder('clip-ViT-B-32', device, backend="torch", precision=precision)
+            _clip_variants[precision] = model
+    return model
+
+
+def load_rgb_image(img_path: str) -> Image.Image:
+    """Open and fully decode an image as RGB."""
+    return Image.open(img_path).convert('RGB')
+
+
+def generate_image_embeddings(
+    image_paths: List[str],
+    batch_size: int = 256,
+    precision: Optional[str] = None
+) -> np.ndarray:
     """
     Generate CLIP embeddings for images.
-    Batch processing for speed.
+    Batch processing for speed, with CLIP weights in the given precision
+    (None uses MOSAIC_ENCODER_PRECISION).
+    JPEGs are decoded on a thread pool (libjpeg releases the GIL while decoding),
+    or directly into GPU memory with nvJPEG when running on CUDA.
     """
-    images = [Image.open(img_path).convert('RGB') for img_path in image_paths]
-    embeddings = clip_model.encode(images, batch_size=32, show_progress_bar=False)
-    return embeddings
+    if GPU_JPEG_DECODE and device == 'cuda':
+        try:
+            return generate_image_embeddings_gpu(image_paths, batch_size=batch_size, precision=precision)
+        except Exception as e:
+            print(f"⚠ GPU JPEG decode unavailable ({e}), decoding on CPU")
+
+    with ThreadPoolExecutor(max_workers=min(32, os.cpu_count() or 1)) as executor:
+        images = list(executor.map(load_rgb_image, image_paths))
+    with torch.inference_mode():
+        embeddings = clip_encoder(precision).encode(images, batch_size=batch_size, show_progress_bar=False)
+    return np.asarray(embeddings, dtype=np.float32)
 
-def generate_text_embeddings(texts: List[str]) -> np.ndarray:
+def generate_image_embeddings_gpu(
+    image_paths: List[str],
+    batch_size: int = 256,
+    precision: Optional[str] = None
+) -> np.ndarray:
+    """
+    Generate CLIP embeddings with GPU-resident preprocessing: JPEGs are decoded
+    by nvJPEG straight into CUDA memory, resized/cropped/normalized there, and
+    fed to the CLIP vision tower, with no PIL decode or host-to-device image copy.
+    Requires the PyTorch CLIP backend and torchvision with CUDA JPEG support.
+    """
+    from torchvision.io import decode_jpeg, read_file
+    from torchvision.transforms.v2 import functional as TF
+
+    clip = clip_encoder(precision)[0].model  # Hugging Face CLIPModel behind the SentenceTransformer
+    dtype = next(clip.parameters()).dtype
+    size = CLIP_INPUT_SIZE
+    mean = torch.tensor(CLIP_MEAN, device='cuda').view(1, 3, 1, 1)
+    std = torch.tensor(CLIP_STD, device='cuda').view(1, 3, 1, 1)
+
+    batches = []
+    with torch.inference_mode():
+        for start in range(0, len(image_paths), batch_size):
+            data = [read_file(path) for path in image_paths[start:start + batch_size]]
+            decoded = decode_jpeg(data, device='cuda')
+            # Frames of one video share a resolution; resize them as a single batch
+            pixels = torch.stack(decoded) if len({img.shape for img in decoded}) == 1 else None
+            if pixels is None:
+                pixels = torch.stack([
+                    TF.center_crop(TF.resize(img, size, interpolation=TF.InterpolationMode.BICUBIC, antialias=True), size)
+                    for img in decoded
+                ])
+            else:
+                pixels = TF.resize(pixels, size, interpolation=TF.InterpolationMode.BICUBIC, antialias=True)
+                pixels = TF.center_crop(pixels, size)
+            pixels = ((pixels.float() / 255.0 - mean) / std).to(dtype)
+            batches.append(clip.get_image_features(pixel_values=pixels).float().cpu().numpy())
+
+    if not batches:
+        return np.zeros((0, clip.config.projection_dim), dtype=np.float32)
+    return np.concatenate(batches).astype(np.float32, copy=False)
+
+
+def generate_text_embeddings(
+    texts: List[str],
+    batch_size: int = 512
+) -> np.ndarray:
     """
     Generate embeddings for text using lightweight model.
-    Fast and efficient for captions/transcripts.
+    Fast and efficient for captions/transcripts; MiniLM is cheap per sentence,
+    so large batches keep the GPU busy.
     """
-    embeddings = text_model.encode(texts, batch_size=32, show_progress_bar=False)
-    return embeddings
+    with torch.inference_mode():
+        embeddings = text_model.encode(texts, batch_size=batch_size, show_progress_bar=False)
+    return np.asarray(embeddings, dtype=np.float32)
 
 
-# Vector DB Storage
+def _text_key(text: str) -> bytes:
+    """
+    16-byte hash of a text and the text encoder configuration (model, backend,
+    precision) for the embedding cache, so changing any of them re-encodes.
+    """
+    h = hashlib.blake2b(TEXT_ENCODER_TAG.encode('utf-8'), digest_size=16)
+    h.update(b"\0")
+    h.update(text.encode('utf-8'))
+    return h.digest()
 
-def store_embeddings_faiss(embeddings: np.ndarray, index_path: str) -> faiss.Index:
+
+def generate_text_embeddings_cached(texts: List[str], cache_prefix: str) -> np.ndarray:
     """
-    Store image embeddings in FAISS index.
-    Fast similarity search with GPU acceleration if available.
+    generate_text_embeddings with a per-video content-hash cache, so reprocessing
+    a video only encodes transcript segments / captions that changed.
+    The cache is two .npy sidecars: {cache_prefix}.keys.npy (blake2b digests)
+    and {cache_prefix}.npy (float32 embeddings, memory-mapped on load).
     """
-    dimension = embeddings.shape[1]
-    cpu_index = faiss.IndexFlatL2(dimension)
-    cpu_index.add(embeddings.astype('float32'))
-    
-    # Try to use GPU for FAISS if available
-    try:
-        if device == 'cuda' and faiss.get_num_gpus() > 0:
-            res = faiss.StandardGpuResources()
-            gpu_index = faiss.index_cpu_to_gpu(res, 0, cpu_index)
-            print("✓ FAISS using GPU acceleration")
-            # Save CPU version to disk (GPU index can't be saved directly)
-            faiss.write_index(cpu_index, index_path)
-            return gpu_index
-    except Exception as e:
-        print(f"⚠ FAISS GPU not available ({e}), using CPU")
-    
-    # Save index to disk
-    faiss.write_index(cpu_index, index_path)
-    return cpu_index
+    keys_path, embeddings_path = f"{cache_prefix}.keys.npy", f"{cache_prefix}.npy"
+    cached = {}
+    if os.path.exists(keys_path) and os.path.exists(embeddings_path):
+        try:
+            cached_keys = np.load(keys_path)
+            cached_embeddings = np.load(embeddings_path, mmap_mode='r')
+            if len(cached_keys) == len(cached_embeddings):
+                cached = {key: row for row, key in enumerate(cached_keys.tolist())}
+        except (OSError, ValueError) as e:
+            print(f"⚠ Ignoring unreadable text embedding cache ({e})")
+
+    keys = [_text_key(text) for text in texts]
+    missing = [i for i, key in enumerate(keys) if key not in cached]
+    dimension = text_model.get_sentence_embedding_dimension()
+    embeddings = np.empty((len(texts), dimension), dtype=np.float32)
+    hits = [i for i, key in enumerate(keys) if key in cached]
+    if hits:
+        embeddings[hits] = cached_embeddings[[cached[keys[i]] for i in hits]]
+    if missing:
+        embeddings[missing] = generate_text_embeddings([texts[i] for i in missing])
+    print(f"Text embeddings: {len(hits)} cached, {len(missing)} encoded")
+
+    if missing or len(cached) != len(texts):
+        # Write-then-rename: the old embeddings file may still be memory-mapped
+        for path, array in ((embeddings_path, embeddings), (keys_path, np.array(keys, dtype='S16'))):
+            with open(path + ".tmp", "wb") as f:
+                np.save(f, array)
+            os.replace(path + ".tmp", path)
+    return embeddings
 
 
+# Vector DB Storage
+
 def store_text_chromadb(
     texts: List[str], 
     embeddings: np.ndarray,
@@ -368,6 +755,8 @@ def store_text_chromadb(
 ) -> chromadb.Collection:
     """
     Store text embeddings and metadata in ChromaDB.
+    Embeddings are passed as a float32 ndarray (no Python list-of-lists), in
+    batches of at most CHROMA_ADD_BATCH records.
     """
     client = chromadb.PersistentClient(path="./chroma_db")
     
@@ -383,13 +772,17 @@ def store_text_chromadb(
     )
     
     ids = [f"doc_{i}" for i in range(len(texts))]
+    embeddings = np.ascontiguousarray(embeddings, dtype=np.float32)
+    batch_size = min(CHROMA_ADD_BATCH, client.get_max_batch_size())
     
-    collection.add(
-        documents=texts,
-        embeddings=embeddings.tolist(),
-        metadatas=metadatas,
-        ids=ids
-    )
+    for start in range(0, len(texts), batch_size):
+        end = start + batch_size
+        collection.add(
+            documents=texts[start:end],
+            embeddings=embeddings[start:end],
+            metadatas=metadatas[start:end],
+            ids=ids[start:end]
+        )
     
     return collection
 
@@ -527,18 +920,50 @@ class VideoProcessingPipeline():
         self.chroma_collection = None
         self.frame_paths = []
     
-    def process_video(self, video_path: str, video_id: str) -> Dict:
+    def process_video(
+        self,
+        video_path: str,
+        video_id: str,
+        batch_size: int = 256,
+        precision: Optional[str] = None,
+        progress_cb: Optional[Callable[[Dict], None]] = None
+    ) -> Dict:
         # Create video-specific directories
         video_dir = os.path.join(self.storage_dir, video_id)
         frames_dir = os.path.join(video_dir, "frames")
         os.makedirs(frames_dir, exist_ok=True)
+
+        def report(step: int, stage: str, **details):
+            # Stage-by-stage progress for callers streaming the job (e.g. SSE)
+            if progress_cb is not None:
+                progress_cb({"video_id": video_id, "step": step, "total_steps": 7, "stage": stage, **details})
         
         print(f"Processing video: {video_path}")
 
+        # Indices are about to be rewritten; index_complete.json is restored at the end
+        Path(video_dir, "index_complete.json").unlink(missing_ok=True)
+
+        # Audio extraction + Groq transcription is FFmpeg/network bound and independent
+        # of the frame stages, so it runs in the background alongside steps 1-3 (awaited at step 4)
+        audio_path = os.path.join(video_dir, "audio.wav")
+        audio_executor = ThreadPoolExecutor(max_workers=1)
+        transcription_future = audio_executor.submit(extract_and_transcribe_audio, video_path, audio_path)
+        audio_executor.shutdown(wait=False)
     
         # Step 1: Extract keyframes using FFmpeg (now returns timestamps too)
+        # Frames are embedded from the same decode; fall back to the two-pass path on failure
         print("Extracting keyframes...")
-        frame_paths, frame_timestamps = extract_keyframes_ffmpeg(video_path, frames_dir)
+        report(1, "extracting_frames")
+        try:
+            frame_paths, frame_timestamps, image_embeddings = extract_and_embed_keyframes(
+                video_path, frames_dir, batch_size=batch_size, precision=precision
+            )
+        except Exception as e:
+            print(f"⚠ Single-pass extraction failed ({e}), extracting frames then embedding")
+            for stale in Path(frames_dir).glob("frame_*.jpg"):
+                stale.unlink()
+            frame_paths, frame_timestamps = extract_keyframes_ffmpeg(video_path, frames_dir)
+            image_embeddings = None
         self.frame_paths = frame_paths
         print(f"Extracted {len(frame_paths)} keyframes")
         
@@ -557,29 +982,67 @@ class VideoProcessingPipeline():
                 "frame_count": len(frame_paths)
             }, f)
 
-        #  Step 2: Extract and transcribe audio using Groq
-        print("Extracting audio...")
-        audio_path = os.path.join(video_dir, "audio.wav")
-        extract_audio_ffmpeg(video_path, audio_path)
-
-        print("Transcribing audio with Groq Whisper...")
-        transcription_result = transcribe_with_groq(audio_path)
-        transcript_text = transcription_result["text"]
-        segments = transcription_result["segments"]
-        print(f"Transcription complete: {len(transcript_text)} characters")
-
-
-        # Step 3: Generate embeddings for frames
+        # Step 2: Generate embeddings for frames
         print("Generating image embeddings...")
-        image_embeddings = generate_image_embeddings(frame_paths)
+        report(2, "embedding_frames", frames_extracted=len(frame_paths))
+        if image_embeddings is None:
+            image_embeddings = generate_image_embeddings(
+                frame_paths,
+                batch_size=batch_size,
+                precision=precision
+            )
 
-        # Step 4: Store image embeddings in FAISS
+        # Keep an fp16 copy so the index can be rebuilt without the image encoder
+        save_embeddings_fp16(image_embeddings, os.path.join(video_dir, "embeddings.f16.npy"))
+
+        # Step 3: Store image embeddings in FAISS
         print("Storing image embeddings in FAISS...")
+        report(3, "indexing_frames")
         faiss_index_path = os.path.join(video_dir, "faiss_index.bin")
-        self.faiss_index = store_embeddings_faiss(image_embeddings, faiss_index_path)
+        # The fp16 sidecar is already written, so the buffer can be normalized in place
+        self.faiss_index = store_embeddings_faiss(image_embeddings, faiss_index_path, copy=False)
+
+        # Step 4: Wait for the background audio extraction and Groq transcription
+        report(4, "transcribing_audio")
+        transcription_result = transcription_future.result()
+        transcript_text = transcription_result["text"]
+        segments = transcription_result["segments"]
 
-        # Step 5: Store transcript in ChromaDB
+        # Step 5: Generate captions for frames using Vision model (only 1 in 10 frames)
+        # Captions come before transcript indexing so all text is embedded in one pass
+        print("Generating AI captions for frames (1 in every 10)...")
+        report(5, "captioning_frames")
+        try:
+            # Only caption every 10th frame to save API calls
+            caption_interval = 10
+            frames_to_caption = frame_paths[::caption_interval]
+            timestamps_to_caption = frame_timestamps[::caption_interval]
+            
+            sparse_captions = generate_captions_batch(frames_to_caption, timestamps_to_caption)
+            
+            # Expand captions: assign each caption to the surrounding frames
+            frame_captions = []
+            caption_idx = 0
+            for i in range(len(frame_paths)):
+                # Find the nearest captioned frame
+                nearest_caption_idx = min(i // caption_interval, len(sparse_captions) - 1)
+                frame_captions.append(sparse_captions[nearest_caption_idx])
+                
+        except Exception as e:
+            print(f"Vision captioning failed, using fallback: {e}")
+            frame_captions = [f"Video frame {i+1} at {frame_timestamps[i]:.1f}s" for i in range(len(frame_paths))]
+        
+        # Save captions to file for reference
+        captions_path = os.path.join(video_dir, "frame_captions.json")
+        with open(captions_path, "w") as f:
+            json.dump([
+                {"frame_index": i, "timestamp": frame_timestamps[i], "caption": caption, "is_captioned": (i % 10 == 0)}
+                for i, caption in enumerate(frame_captions)
+            ], f, indent=2)
+
+        # Step 6: Store transcript in ChromaDB
         print("Storing transcript in ChromaDB...")
+        report(6, "indexing_transcript")
         
         # Store full transcript
         full_transcript_metadata = [{
@@ -591,7 +1054,6 @@ class VideoProcessingPipeline():
 
         # Store transcript segments
         segment_texts = [seg["text"] for seg in segments]
-        segment_embeddings = generate_text_embeddings([transcript_text] + segment_texts)
         
         segment_metadatas = [
             {
@@ -605,6 +1067,33 @@ class VideoProcessingPipeline():
 
         all_texts = [transcript_text] + segment_texts
         all_metadatas = full_transcript_metadata + segment_metadatas
+
+        # Each caption is shared by ~caption_interval neighbouring frames, so only
+        # the distinct captions are encoded and then expanded back per frame
+        caption_slots = {}
+        caption_index = np.fromiter(
+            (caption_slots.setdefault(caption, len(caption_slots)) for caption in frame_captions),
+            dtype=np.int64,
+            count=len(frame_captions)
+        )
+        unique_captions = list(caption_slots)
+
+        # One encode for segments and distinct frame captions, sliced back apart.
+        # The full transcript is just the segments joined, so it is embedded as their
+        # normalized mean instead of a (truncated) forward pass over the long string.
+        encode_texts = segment_texts if segment_texts else [transcript_text]
+        text_embeddings = generate_text_embeddings_cached(
+            encode_texts + unique_captions,
+            os.path.join(video_dir, "text_embeddings")
+        )
+        encoded_segments = text_embeddings[:len(encode_texts)]
+        frame_caption_embeddings = text_embeddings[len(encode_texts):][caption_index]
+        if segment_texts:
+            transcript_embedding = encoded_segments.mean(axis=0, keepdims=True)
+            transcript_embedding /= max(np.linalg.norm(transcript_embedding), 1e-12)
+            segment_embeddings = np.concatenate([transcript_embedding, encoded_segments])
+        else:
+            segment_embeddings = encoded_segments
         
         self.chroma_collection = store_text_chromadb(
             texts=all_texts,
@@ -612,40 +1101,10 @@ class VideoProcessingPipeline():
             metadatas=all_metadatas,
             collection_name=f"video_{video_id}"
         )
-
-         # Step 6: Generate captions for frames using Vision model (only 1 in 10 frames)
-        print("Generating AI captions for frames (1 in every 10)...")
-        try:
-            # Only caption every 10th frame to save API calls
-            caption_interval = 10
-            frames_to_caption = frame_paths[::caption_interval]
-            timestamps_to_caption = frame_timestamps[::caption_interval]
-            
-            sparse_captions = generate_captions_batch(frames_to_caption, timestamps_to_caption)
-            
-            # Expand captions: assign each caption to the surrounding frames
-            frame_captions = []
-            caption_idx = 0
-            for i in range(len(frame_paths)):
-                # Find the nearest captioned frame
-                nearest_caption_idx = min(i // caption_interval, len(sparse_captions) - 1)
-                frame_captions.append(sparse_captions[nearest_caption_idx])
-                
-        except Exception as e:
-            print(f"Vision captioning failed, using fallback: {e}")
-            frame_captions = [f"Video frame {i+1} at {frame_timestamps[i]:.1f}s" for i in range(len(frame_paths))]
-        
-        # Save captions to file for reference
-        captions_path = os.path.join(video_dir, "frame_captions.json")
-        with open(captions_path, "w") as f:
-            json.dump([
-                {"frame_index": i, "timestamp": frame_timestamps[i], "caption": caption, "is_captioned": (i % 10 == 0)}
-                for i, caption in enumerate(frame_captions)
-            ], f, indent=2)
         
         # Step 7: Store frame captions in ChromaDB for semantic text search
         print("Storing frame captions in ChromaDB...")
-        frame_caption_embeddings = generate_text_embeddings(frame_captions)
+        report(7, "indexing_captions")
         frame_metadatas = [
             {
                 "type": "frame",
@@ -665,7 +1124,12 @@ class VideoProcessingPipeline():
             collection_name=f"frames_{video_id}"
         )
 
-
+        # Written last: marks the indices as complete and keys caches derived from the transcript
+        with open(os.path.join(video_dir, "index_complete.json"), "w") as f:
+            json.dump({
+                "video_id": video_id,
+                "transcript_hash": hashlib.blake2b(transcript_text.encode('utf-8'), digest_size=16).hexdigest()
+            }, f)
 
         print("Processing complete!")
         
@@ -2,9 +2,14 @@
 Pytest configuration and fixtures
 """
 
+import os
+import sys
 import pytest
 import asyncio
 
+# Server modules use flat imports (e.g. "from encoders import ..."), so put src/ on the path
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
 @pytest.fixture(scope="session")
 def event_loop():
     """Create event loop for async tests"""
@@ -0,0 +1,49 @@
+"""
+Tests for the storage size walk in scripts/clear_storage.py
+"""
+
+import importlib.util
+import os
+from pathlib import Path
+import pytest
+
+_SCRIPT = Path(__file__).resolve().parents[2] / "scripts" / "clear_storage.py"
+_spec = importlib.util.spec_from_file_location("clear_storage", _SCRIPT)
+clear_storage = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(clear_storage)
+
+
+def test_get_dir_size_sums_nested_files(tmp_path):
+    (tmp_path / "a.bin").write_bytes(b"x" * 10)
+    nested = tmp_path / "frames" / "video1"
+    nested.mkdir(parents=True)
+    (nested / "frame_0001.jpg").write_bytes(b"x" * 100)
+    (nested / "frame_0002.jpg").write_bytes(b"x" * 1000)
+    (tmp_path / "empty").mkdir()
+
+    assert clear_storage.get_dir_size(tmp_path) == 1110
+
+
+def test_get_dir_size_missing_or_file_is_zero(tmp_path):
+    file_path = tmp_path / "a.bin"
+    file_path.write_bytes(b"x" * 10)
+
+    assert clear_storage.get_dir_size(tmp_path / "missing") == 0
+    assert clear_storage.get_dir_size(file_path) == 0
+
+
+@pytest.mark.skipif(not hasattr(os, "symlink"), reason="symlinks unsupported")
+def test_get_dir_size_does_not_follow_symlinks(tmp_path):
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "big.bin").write_bytes(b"x" * 5000)
+    root = tmp_path / "root"
+    root.mkdir()
+    (root / "small.bin").write_bytes(b"x" * 7)
+    try:
+        os.symlink(outside, root / "linked_dir", target_is_directory=True)
+        os.symlink(outside / "big.bin", root / "linked_file")
+    except OSError:
+        pytest.skip("symlinks not permitted")
+
+    assert clear_storage.get_dir_size(root) == 7
@@ -0,0 +1,87 @@
+"""
+Tests for FAISS index construction and persistence
+"""
+
+import json
+import numpy as np
+import faiss
+import pytest
+
+import faiss_store
+
+
+def _embeddings(n, dim=64, seed=0):
+    return np.random.default_rng(seed).random((n, dim), dtype=np.float32)
+
+
+@pytest.mark.parametrize("index_type, expected", [
+    ("flat", faiss.IndexFlatL2),
+    ("sqfp16", faiss.IndexScalarQuantizer),
+    ("sq8", faiss.IndexScalarQuantizer),
+    ("hnsw", faiss.IndexHNSWFlat),
+    ("hnsw_sq8", faiss.IndexHNSWSQ),
+])
+def test_build_faiss_index_explicit_types(monkeypatch, index_type, expected):
+    monkeypatch.setattr(faiss_store, "FAISS_INDEX_TYPE", index_type)
+
+    index = faiss_store.build_faiss_index(_embeddings(300))
+
+    assert isinstance(index, expected)
+    assert index.ntotal == 300
+
+
+def test_build_faiss_index_auto_uses_hnsw_sq8_below_threshold(monkeypatch):
+    monkeypatch.setattr(faiss_store, "FAISS_INDEX_TYPE", "auto")
+    monkeypatch.setattr(faiss_store, "IVFPQ_MIN_VECTORS", 1000)
+
+    index = faiss_store.build_faiss_index(_embeddings(999))
+
+    assert isinstance(index, faiss.IndexHNSWSQ)
+    assert index.hnsw.efSearch == faiss_store.HNSW_EF_SEARCH
+
+
+def test_build_faiss_index_auto_uses_ivfpq_above_threshold(monkeypatch):
+    monkeypatch.setattr(faiss_store, "FAISS_INDEX_TYPE", "auto")
+    monkeypatch.setattr(faiss_store, "IVFPQ_MIN_VECTORS", 1000)
+    monkeypatch.setattr(faiss_store, "FAISS_NLIST", 0)
+
+    index = faiss_store.build_faiss_index(_embeddings(3000))
+
+    assert isinstance(index, faiss.IndexIVFPQ)
+    assert index.is_trained and index.ntotal == 3000
+    assert index.nprobe == faiss_store.FAISS_NPROBE
+
+
+def test_build_faiss_index_ivfpq_falls_back_to_flat_when_too_small(monkeypatch):
+    monkeypatch.setattr(faiss_store, "FAISS_INDEX_TYPE", "ivfpq")
+    monkeypatch.setattr(faiss_store, "FAISS_NLIST", 0)
+
+    index = faiss_store.build_faiss_index(_embeddings(100))
+
+    assert isinstance(index, faiss.IndexFlatL2)
+
+
+def test_store_embeddings_faiss_normalizes_and_writes_sidecar(tmp_path, monkeypatch):
+    monkeypatch.setattr(faiss_store, "FAISS_INDEX_TYPE", "flat")
+    monkeypatch.setattr(faiss_store, "device", "cpu")
+    embeddings = _embeddings(20, dim=8)
+    original = embeddings.copy()
+    index_path = str(tmp_path / "faiss_index.bin")
+
+    faiss_store.store_embeddings_faiss(embeddings, index_path)
+
+    # copy=True leaves the caller's array untouched
+    np.testing.assert_array_equal(embeddings, original)
+    with open(tmp_path / "faiss_index.json") as f:
+        assert json.load(f) == {"normalized": True, "metric": "l2", "ntotal": 20}
+    stored = faiss.read_index(index_path).reconstruct_n(0, 20)
+    np.testing.assert_allclose(np.linalg.norm(stored, axis=1), 1.0, rtol=1e-5)
+
+
+def test_frame_paths_for_sorts_numerically_past_9999(tmp_path):
+    paths = faiss_store.frame_paths_for(str(tmp_path), 10001)
+
+    assert paths[0].endswith("frame_0001.jpg")
+    assert paths[9998].endswith("frame_9999.jpg")
+    assert paths[9999].endswith("frame_10000.jpg")
+    assert len(paths) == 10001
@@ -0,0 +1,99 @@
+"""
+Tests for the video pipeline's text embedding cache and WAV helpers
+"""
+
+import struct
+import types
+import numpy as np
+import pytest
+
+import video_processor
+
+
+@pytest.fixture
+def fake_encoder(monkeypatch):
+    """Replace the text model with a deterministic 2-d encoder that records its inputs."""
+    calls = []
+
+    def encode(texts):
+        calls.append(list(texts))
+        return np.array([[len(text), sum(map(ord, text))] for text in texts], dtype=np.float32)
+
+    monkeypatch.setattr(video_processor, "generate_text_embeddings", encode)
+    monkeypatch.setattr(video_processor, "text_model",
+                        types.SimpleNamespace(get_sentence_embedding_dimension=lambda: 2))
+    return calls
+
+
+def test_text_cache_encodes_only_new_texts(tmp_path, fake_encoder):
+    prefix = str(tmp_path / "transcript")
+
+    first = video_processor.generate_text_embeddings_cached(["a", "bb"], prefix)
+    second = video_processor.generate_text_embeddings_cached(["bb", "ccc", "a"], prefix)
+
+    assert fake_encoder == [["a", "bb"], ["ccc"]]
+    np.testing.assert_array_equal(second[[0, 2]], first[[1, 0]])
+    np.testing.assert_array_equal(second[1], [3, 3 * ord("c")])
+    assert (tmp_path / "transcript.keys.npy").exists()
+    assert (tmp_path / "transcript.npy").exists()
+
+
+def test_text_cache_unchanged_input_skips_encoder(tmp_path, fake_encoder):
+    prefix = str(tmp_path / "transcript")
+
+    first = video_processor.generate_text_embeddings_cached(["a", "bb"], prefix)
+    second = video_processor.generate_text_embeddings_cached(["a", "bb"], prefix)
+
+    assert fake_encoder == [["a", "bb"]]
+    np.testing.assert_array_equal(first, second)
+
+
+def test_text_cache_invalidated_by_encoder_change(tmp_path, monkeypatch, fake_encoder):
+    prefix = str(tmp_path / "transcript")
+
+    video_processor.generate_text_embeddings_cached(["a", "bb"], prefix)
+    monkeypatch.setattr(video_processor, "TEXT_ENCODER_TAG", "other-model|torch|fp32")
+    video_processor.generate_text_embeddings_cached(["a", "bb"], prefix)
+
+    assert fake_encoder == [["a", "bb"], ["a", "bb"]]
+
+
+def test_text_cache_ignores_corrupt_sidecars(tmp_path, fake_encoder):
+    prefix = str(tmp_path / "transcript")
+    (tmp_path / "transcript.keys.npy").write_bytes(b"not a numpy file")
+    (tmp_path / "transcript.npy").write_bytes(b"not a numpy file")
+
+    embeddings = video_processor.generate_text_embeddings_cached(["a"], prefix)
+
+    assert fake_encoder == [["a"]]
+    np.testing.assert_array_equal(embeddings, [[1, ord("a")]])
+
+
+def _streamed_wav(samples: bytes, size_placeholder: int) -> bytearray:
+    """A 16-bit mono WAV as FFmpeg writes it to a pipe, with unpatched chunk sizes."""
+    fmt = struct.pack("<4sIHHIIHH", b"fmt ", 16, 1, 1, 16000, 32000, 2, 16)
+    header = struct.pack("<4sI4s", b"RIFF", size_placeholder, b"WAVE")
+    # FFmpeg also emits a LIST chunk, so the data chunk isn't at a fixed offset
+    info = struct.pack("<4sI", b"LIST", 4) + b"INFO"
+    data = struct.pack("<4sI", b"data", size_placeholder) + samples
+    return bytearray(header + fmt + info + data)
+
+
+@pytest.mark.parametrize("placeholder", [0, 0xFFFFFFFF])
+def test_fix_wav_sizes_patches_riff_and_data(placeholder):
+    samples = b"\x01\x02" * 50
+    wav = _streamed_wav(samples, placeholder)
+
+    fixed = video_processor._fix_wav_sizes(wav)
+
+    assert isinstance(fixed, bytes)
+    assert struct.unpack_from("<I", fixed, 4)[0] == len(fixed) - 8
+    data_offset = fixed.find(b"data", 12)
+    assert struct.unpack_from("<I", fixed, data_offset + 4)[0] == len(samples)
+    assert fixed[data_offset + 8:] == samples
+
+
+def test_fix_wav_sizes_leaves_non_wav_untouched():
+    payload = bytearray(b"not a wav file at all")
+
+    assert video_processor._fix_wav_sizes(payload) == b"not a wav file at all"
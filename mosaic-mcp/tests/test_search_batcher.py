@@ -0,0 +1,86 @@
+"""
+Tests for FAISS search micro-batching
+"""
+
+import threading
+import time
+import numpy as np
+import faiss
+
+from search_batcher import SearchBatcher
+
+
+class CountingIndex:
+    """Wraps a FAISS index and records every search call"""
+
+    def __init__(self, index, release=None):
+        self.index = index
+        self.calls = []
+        self.release = release
+
+    def search(self, xq, k):
+        self.calls.append((xq.shape[0], k))
+        if self.release is not None:
+            self.release.wait(timeout=5)
+        return self.index.search(xq, k)
+
+
+def _flat_index(n=50, dim=8, seed=0):
+    rng = np.random.default_rng(seed)
+    index = faiss.IndexFlatL2(dim)
+    index.add(rng.random((n, dim), dtype=np.float32))
+    return index
+
+
+def test_uncontended_search_skips_batching_window():
+    index = CountingIndex(_flat_index())
+    batcher = SearchBatcher(max_batch=32, max_wait_ms=2000)
+    query = np.random.default_rng(1).random((1, 8), dtype=np.float32)
+
+    start = time.monotonic()
+    distances, indices = batcher.search("video", index, query, 5)
+
+    assert time.monotonic() - start < 1.0
+    expected_d, expected_i = index.index.search(query, 5)
+    np.testing.assert_array_equal(indices, expected_i)
+    np.testing.assert_allclose(distances, expected_d)
+    assert index.calls == [(1, 5)]
+
+
+def test_concurrent_searches_share_one_batched_call():
+    batcher = SearchBatcher(max_batch=4, max_wait_ms=5000)
+
+    # A search in flight on another video makes the batcher treat the next ones as contended
+    release = threading.Event()
+    blocker = CountingIndex(_flat_index(seed=2), release=release)
+    blocker_thread = threading.Thread(
+        target=batcher.search, args=("other", blocker, np.zeros((1, 8), dtype=np.float32), 1)
+    )
+    blocker_thread.start()
+    while not blocker.calls:
+        time.sleep(0.01)
+
+    index = CountingIndex(_flat_index())
+    rng = np.random.default_rng(3)
+    queries = [rng.random((1, 8), dtype=np.float32) for _ in range(4)]
+    ks = [1, 3, 5, 2]
+    results = [None] * 4
+
+    def search(i):
+        results[i] = batcher.search("video", index, queries[i], ks[i])
+
+    threads = [threading.Thread(target=search, args=(i,)) for i in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+    release.set()
+    blocker_thread.join(timeout=5)
+
+    # One stacked search with the largest k, then each caller gets its own row and k
+    assert index.calls == [(4, 5)]
+    for query, k, (distances, indices) in zip(queries, ks, results):
+        expected_d, expected_i = index.index.search(query, k)
+        assert indices.shape == (1, k)
+        np.testing.assert_array_equal(indices, expected_i)
+        np.testing.assert_allclose(distances, expected_d, rtol=1e-5)
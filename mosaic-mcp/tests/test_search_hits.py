@@ -0,0 +1,48 @@
+"""
+Tests for converting search hits into clip timing columns
+"""
+
+import numpy as np
+
+from search_engine import hits_to_soa
+
+
+def test_hits_to_soa_handles_each_hit_shape():
+    hits = [
+        {"start": 10.0, "end": 40.0, "text": "long segment"},
+        {"start": 3.0, "end": 5.0, "text": "short segment"},
+        {"clip_start": 7.0, "clip_duration": 5.0, "timestamp": 8.0},
+        {"timestamp": 0.4},
+        {"timestamp": 12.0},
+    ]
+
+    hit_numbers, starts, durations = hits_to_soa(hits, pre_sec=1.0, clip_sec=5.0)
+
+    np.testing.assert_array_equal(hit_numbers, [1, 2, 3, 4, 5])
+    # Timestamp hits start pre_sec earlier, clamped at 0
+    np.testing.assert_allclose(starts, [10.0, 3.0, 7.0, 0.0, 11.0])
+    # Ranged hits under 5 s are extended to 20 s; timestamp hits last clip_sec
+    np.testing.assert_allclose(durations, [30.0, 20.0, 5.0, 5.0, 5.0])
+    assert hit_numbers.dtype == np.int64
+    assert starts.dtype == durations.dtype == np.float64
+
+
+def test_hits_to_soa_skips_hits_without_timing_but_keeps_numbering():
+    hits = [
+        None,
+        {"text": "no timing"},
+        {"clip_start": None, "clip_duration": 5.0, "timestamp": None},
+        {"timestamp": 30.0},
+    ]
+
+    hit_numbers, starts, durations = hits_to_soa(hits)
+
+    np.testing.assert_array_equal(hit_numbers, [4])
+    np.testing.assert_allclose(starts, [29.0])
+    np.testing.assert_allclose(durations, [5.0])
+
+
+def test_hits_to_soa_empty():
+    hit_numbers, starts, durations = hits_to_soa([])
+
+    assert hit_numbers.shape == starts.shape == durations.shape == (0,)
@@ -0,0 +1,167 @@
+"""
+Tests for server-side search deduplication (single-flight + TTL cache)
+"""
+
+import threading
+import time
+import pytest
+
+import server
+
+
+@pytest.fixture(autouse=True)
+def clean_search_cache(monkeypatch):
+    """Start every test with no cached or in-flight searches"""
+    server._search_cache.clear()
+    server._inflight.clear()
+    monkeypatch.setattr(server, "SEARCH_CACHE_TTL", 60.0)
+    yield
+    server._search_cache.clear()
+    server._inflight.clear()
+
+
+def _run_concurrently(key, fn, followers=4):
+    """Start a leader call, wait until fn is running, then pile on followers"""
+    results, errors = [], []
+
+    def call():
+        try:
+            results.append(server._single_flight(key, fn, value=1))
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=call)]
+    threads[0].start()
+    fn.started.wait(timeout=5)
+    for _ in range(followers):
+        thread = threading.Thread(target=call)
+        thread.start()
+        threads.append(thread)
+    # Give followers time to block on the leader's future before it finishes
+    time.sleep(0.1)
+    fn.release.set()
+    for thread in threads:
+        thread.join(timeout=5)
+    return results, errors
+
+
+class BlockingFn:
+    """Callable that blocks until released and counts its invocations"""
+
+    def __init__(self, result=None, error=None):
+        self.calls = 0
+        self.result = result
+        self.error = error
+        self.started = threading.Event()
+        self.release = threading.Event()
+
+    def __call__(self, value):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(timeout=5)
+        if self.error is not None:
+            raise self.error
+        return self.result
+
+
+def test_concurrent_identical_calls_run_once(monkeypatch):
+    monkeypatch.setattr(server, "SEARCH_CACHE_TTL", 0)
+    fn = BlockingFn(result=[{"frame_index": 3}])
+
+    results, errors = _run_concurrently(("search_visual", "cat", "vid", 5), fn)
+
+    assert fn.calls == 1
+    assert not errors
+    assert results == [[{"frame_index": 3}]] * 5
+    assert not server._inflight
+
+
+def test_errors_propagate_to_followers_and_are_not_cached():
+    fn = BlockingFn(error=ValueError("boom"))
+    key = ("search_text", "cat", "vid", 5)
+
+    results, errors = _run_concurrently(key, fn)
+
+    assert fn.calls == 1
+    assert not results
+    assert len(errors) == 5 and all(isinstance(e, ValueError) for e in errors)
+    assert key not in server._search_cache
+    assert not server._inflight
+
+    # The next call runs the function again instead of replaying the error
+    fn.error, fn.result = None, ["ok"]
+    assert server._single_flight(key, fn, value=1) == ["ok"]
+    assert fn.calls == 2
+
+
+def test_engine_error_results_are_not_cached():
+    calls = []
+
+    def fn(value):
+        calls.append(value)
+        return [{"error": "index missing"}]
+
+    key = ("search_caption", "cat", "vid", 5)
+    server._single_flight(key, fn, value=1)
+    server._single_flight(key, fn, value=1)
+
+    assert len(calls) == 2
+
+
+def test_results_cached_until_ttl_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(server.time, "monotonic", lambda: now[0])
+    monkeypatch.setattr(server, "SEARCH_CACHE_TTL", 60.0)
+    calls = []
+
+    def fn(value):
+        calls.append(value)
+        return [{"call": len(calls)}]
+
+    key = ("search_image", "query.jpg", "vid", 5)
+    assert server._single_flight(key, fn, value=1) == [{"call": 1}]
+
+    now[0] += 59
+    assert server._single_flight(key, fn, value=1) == [{"call": 1}]
+    assert len(calls) == 1
+
+    now[0] += 2
+    assert server._single_flight(key, fn, value=1) == [{"call": 2}]
+    assert len(calls) == 2
+
+
+def _make_tree(root):
+    """frames/a.jpg, frames/b.jpg, frames/nested/c.jpg, index.bin and a symlinked outside dir"""
+    (root / "frames" / "nested").mkdir(parents=True)
+    (root / "frames" / "a.jpg").write_bytes(b"a")
+    (root / "frames" / "b.jpg").write_bytes(b"bb")
+    (root / "frames" / "nested" / "c.jpg").write_bytes(b"ccc")
+    (root / "index.bin").write_bytes(b"idx")
+
+
+def test_count_files_walks_nested_dirs_without_following_symlinks(tmp_path):
+    root = tmp_path / "storage"
+    _make_tree(root)
+    outside = tmp_path / "outside"
+    outside.mkdir()
+    (outside / "x.jpg").write_bytes(b"x")
+    (root / "link").symlink_to(outside, target_is_directory=True)
+
+    assert server._count_files(str(root)) == 4
+
+
+def test_clear_one_empties_root_but_keeps_it(tmp_path):
+    root = tmp_path / "chroma_db"
+    _make_tree(root)
+    root.chmod(0o750)
+
+    cleared, file_count, error = server._clear_one(str(root))
+
+    assert (cleared, file_count, error) == (True, 4, None)
+    assert root.is_dir()
+    assert list(root.iterdir()) == []
+    assert root.stat().st_mode & 0o777 == 0o750
+
+
+def test_clear_one_skips_missing_root(tmp_path):
+    assert server._clear_one(str(tmp_path / "missing")) == (False, 0, None)
@@ -16,6 +16,7 @@ Usage:
 import os
 import shutil
 import argparse
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from typing import List, Dict
 
@@ -43,14 +44,33 @@ STORAGE_DIRS = [
 # Files to preserve (e.g., .gitkeep files)
 PRESERVE_FILES = [".gitkeep", ".gitignore"]
 
+# Directories cleared concurrently (deletion is syscall/I-O bound)
+MAX_WORKERS = 8
+
+# unlinkat(2) via dir_fd is available on Linux/macOS but not Windows
+_FD_DELETES = os.unlink in os.supports_dir_fd
+
 
 def get_dir_size(path: Path) -> int:
-    """Calculate the total size of a directory in bytes."""
+    """
+    Calculate the total size of a directory in bytes.
+    Walks with os.scandir and an explicit stack; DirEntry caches the file type
+    from the directory listing, so only regular files need a stat call.
+    """
     total = 0
-    if path.exists() and path.is_dir():
-        for entry in path.rglob("*"):
-            if entry.is_file():
-                total += entry.stat().st_size
+    if not (path.exists() and path.is_dir()):
+        return total
+    stack = [str(path)]
+    while stack:
+        try:
+            with os.scandir(stack.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total += entry.stat(follow_symlinks=False).st_size
+        except OSError:
+            continue
     return total
 
 
@@ -63,7 +83,12 @@ def format_size(size_bytes: int) -> str:
     return f"{size_bytes:.2f} TB"
 
 
-def clear_directory(dir_path: Path, preserve_files: List[str] = None, dry_run: bool = False) -> Dict:
+def clear_directory(
+    dir_path: Path,
+    preserve_files: List[str] = None,
+    dry_run: bool = False,
+    compute_size: bool = True
+) -> Dict:
     """
     Clear contents of a directory while optionally preserving certain files.
     
@@ -71,6 +96,7 @@ def clear_directory(dir_path: Path, preserve_files: List[str] = None, dry_run: b
         dir_path: Path to the directory to clear
         preserve_files: List of filenames to preserve
         dry_run: If True, don't actually delete anything
+        compute_size: If False, skip the size walk (size_freed stays 0)
         
     Returns:
         Dictionary with statistics about the operation
@@ -93,29 +119,42 @@ def clear_directory(dir_path: Path, preserve_files: List[str] = None, dry_run: b
         stats["errors"].append(f"{dir_path} is not a directory")
         return stats
     
-    # Calculate size before clearing
-    stats["size_freed"] = get_dir_size(dir_path)
+    # Calculate size before clearing (an extra walk of the whole tree)
+    if compute_size:
+        stats["size_freed"] = get_dir_size(dir_path)
     
-    # Get all items in the directory
+    # Get all items in the directory. Entries are removed relative to an open
+    # descriptor of dir_path (unlinkat), so the kernel doesn't re-resolve the
+    # full path for every file; shutil.rmtree does the same for subtrees.
+    dir_fd = None
     try:
-        for item in dir_path.iterdir():
-            if item.name in preserve_files:
-                stats["preserved"].append(item.name)
-                continue
-            
-            try:
-                if item.is_dir():
-                    if not dry_run:
-                        shutil.rmtree(item)
-                    stats["dirs_deleted"] += 1
-                else:
-                    if not dry_run:
-                        item.unlink()
-                    stats["files_deleted"] += 1
-            except Exception as e:
-                stats["errors"].append(f"Error deleting {item}: {e}")
+        if not dry_run and _FD_DELETES:
+            dir_fd = os.open(dir_path, os.O_RDONLY | getattr(os, "O_DIRECTORY", 0))
+        with os.scandir(dir_path) as entries:
+            for entry in entries:
+                if entry.name in preserve_files:
+                    stats["preserved"].append(entry.name)
+                    continue
+                
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        if not dry_run:
+                            shutil.rmtree(entry.path)
+                        stats["dirs_deleted"] += 1
+                    else:
+                        if not dry_run:
+                            if dir_fd is not None:
+                                os.unlink(entry.name, dir_fd=dir_fd)
+                            else:
+                                os.unlink(entry.path)
+                        stats["files_deleted"] += 1
+                except Exception as e:
+                    stats["errors"].append(f"Error deleting {entry.path}: {e}")
     except Exception as e:
         stats["errors"].append(f"Error accessing {dir_path}: {e}")
+    finally:
+        if dir_fd is not None:
+            os.close(dir_fd)
     
     return stats
 
@@ -130,7 +169,8 @@ def clear_all_storage(base_dir: Path = None, dry_run: bool = False, silent: bool
         silent: If True, don't print output
         
     Returns:
-        Dictionary with overall statistics
+        Dictionary with overall statistics (sizes are only measured on dry runs;
+        real deletes skip the extra tree walk and report 0 bytes freed)
     """
     if base_dir is None:
         base_dir = BASE_DIR
@@ -146,19 +186,26 @@ def clear_all_storage(base_dir: Path = None, dry_run: bool = False, silent: bool
         "errors": []
     }
     
+    # Measuring sizes is a second walk of every tree: only do it when previewing
+    compute_size = dry_run
+
     if not silent:
         mode = "[DRY RUN] " if dry_run else ""
         print(f"\n{mode}Clearing Mosaic storage directories...")
         print(f"Base directory: {base_dir}\n")
         print("-" * 60)
     
-    for rel_path in STORAGE_DIRS:
-        dir_path = base_dir / rel_path
-        
+    # Clear all directories concurrently; results come back in STORAGE_DIRS order
+    with ThreadPoolExecutor(max_workers=min(MAX_WORKERS, len(STORAGE_DIRS))) as executor:
+        all_stats = list(executor.map(
+            lambda rel_path: clear_directory(base_dir / rel_path, PRESERVE_FILES, dry_run, compute_size),
+            STORAGE_DIRS
+        ))
+    
+    for rel_path, stats in zip(STORAGE_DIRS, all_stats):
         if not silent:
             print(f"\nProcessing: {rel_path}")
         
-        stats = clear_directory(dir_path, PRESERVE_FILES, dry_run)
         overall_stats["directory_stats"].append(stats)
         
         if stats["exists"]:
@@ -171,7 +218,8 @@ def clear_all_storage(base_dir: Path = None, dry_run: bool = False, silent: bool
                 print(f"  Status: Found")
                 print(f"  Files deleted: {stats['files_deleted']}")
                 print(f"  Directories deleted: {stats['dirs_deleted']}")
-                print(f"  Size freed: {format_size(stats['size_freed'])}")
+                if compute_size:
+                    print(f"  Size freed: {format_size(stats['size_freed'])}")
                 if stats["preserved"]:
                     print(f"  Preserved: {', '.join(stats['preserved'])}")
                 if stats["errors"]:
@@ -189,7 +237,8 @@ def clear_all_storage(base_dir: Path = None, dry_run: bool = False, silent: bool
         print(f"  Directories processed: {overall_stats['directories_processed']}")
         print(f"  Total files deleted: {overall_stats['total_files_deleted']}")
         print(f"  Total directories deleted: {overall_stats['total_dirs_deleted']}")
-        print(f"  Total space freed: {format_size(overall_stats['total_size_freed'])}")
+        if compute_size:
+            print(f"  Total space freed: {format_size(overall_stats['total_size_freed'])}")
         
         if overall_stats["errors"]:
             print(f"\n  Errors encountered: {len(overall_stats['errors'])}")
@@ -1,4 +1,5 @@
 from sentence_transformers import SentenceTransformer
+from concurrent.futures import ThreadPoolExecutor
 from typing import List
 import numpy as np
 from PIL import Image
@@ -22,9 +23,10 @@ clip_model = SentenceTransformer('clip-ViT-B-32', device=device)
 def generate_image_embeddings(image_paths: List[str]) -> np.ndarray:
     """
     Generate CLIP embeddings for images.
-    Batch processing for speed.
+    Batch processing for speed; JPEG decoding runs on a thread pool.
     """
-    images = [Image.open(img_path).convert('RGB') for img_path in image_paths]
+    with ThreadPoolExecutor(max_workers=min(32, os.cpu_count() or 1)) as executor:
+        images = list(executor.map(lambda img_path: Image.open(img_path).convert('RGB'), image_paths))
     embeddings = clip_model.encode(images, batch_size=32, show_progress_bar=False)
     return embeddings
 
@@ -13,7 +13,7 @@ def transcribe_with_groq(audio_path: str, language: str = "en") -> Dict:
             file=audio_file,
             model="whisper-large-v3-turbo",  # Fastest model
             response_format="verbose_json",
-            timestamp_granularities=["word", "segment"],
+            timestamp_granularities=["segment"],
             language=language,
             temperature=0.0
         )